@@ -0,0 +1,184 @@
+# analytics.py (出席集計エンジン - NumPyベクトル化版)
+#
+# 入退室_出席記録を (学生 × 授業回) のステータスコード行列に一度だけ展開し、
+# 出席率・欠席率・連続欠席・警告判定を全学生・全科目分まとめて計算する。
+# DBアクセスは行わない。行データの取得とスナップショットのキャッシュは main.py 側で行う。
+
+from datetime import date
+
+import numpy as np
+
+# =========================================================================
+# ステータスコード
+# =========================================================================
+# 0 は「記録なし」。同じ授業回に複数の記録がある場合は値の大きいコードを採用する
+# (欠席 > 途中退室 > 途中入室 > 遅刻 > 出席 > 未定)。
+CODE_NONE = 0
+STATUS_CODES = {
+    '未定': 1,
+    '出席': 2,
+    '遅刻': 3,
+    '途中入室': 4,
+    '途中退室': 5,
+    '早退': 5,
+    '欠席': 6,
+}
+CODE_PRESENT = STATUS_CODES['出席']
+CODE_LATE = STATUS_CODES['遅刻']
+CODE_ABSENT = STATUS_CODES['欠席']
+CODE_PARTIAL = (STATUS_CODES['途中入室'], STATUS_CODES['途中退室'])
+N_CODES = max(STATUS_CODES.values()) + 1
+
+# 警告判定の閾値 (学生別出席率ページの基準)
+WARNING_CONSECUTIVE_ABSENT = 3
+WARNING_ABSENT_PERCENTAGE = 20
+
+
+def consecutive_absent_streaks(codes):
+    """
+    連続欠席数をベクトル演算で求める。
+    記録なし(0)のセルは連続を途切れさせず、欠席以外の記録で連続がリセットされる。
+    (最大連続欠席数, 現在の連続欠席数) の配列を返す。
+    """
+    if codes.shape[1] == 0:
+        zeros = np.zeros(codes.shape[0], dtype=np.int32)
+        return zeros, zeros.copy()
+    is_absent = codes == CODE_ABSENT
+    is_break = (codes != CODE_NONE) & ~is_absent
+    absent_cum = np.cumsum(is_absent, axis=1, dtype=np.int32)
+    # 直近のリセット時点までの累積欠席数を前方に伝播させる
+    reset_at = np.maximum.accumulate(np.where(is_break, absent_cum, 0), axis=1)
+    streak = absent_cum - reset_at
+    return streak.max(axis=1), streak[:, -1]
+
+
+class AttendanceSnapshot:
+    """学生 × 授業回 のステータス行列と、そこから計算した集計結果"""
+
+    def __init__(self, student_ids, session_keys, session_subjects, codes):
+        self.student_ids = student_ids            # (n_students,) 学籍番号
+        self.session_keys = session_keys          # 授業回 (記録日, 週時間割ID) のリスト (日付順)
+        self.session_subjects = session_subjects  # (n_sessions,) 授業回ごとの授業科目ID
+        self.codes = codes                        # (n_students, n_sessions) int8 ステータスコード
+        self.student_index = {int(s): i for i, s in enumerate(student_ids)}
+        self.subject_ids = np.unique(session_subjects)
+        self.subject_index = {int(s): i for i, s in enumerate(self.subject_ids)}
+        self._compute()
+
+    def _compute(self):
+        codes = self.codes
+        recorded = codes != CODE_NONE
+
+        # 学生別集計
+        self.total = recorded.sum(axis=1)
+        self.attended = (codes == CODE_PRESENT).sum(axis=1)
+        self.late = (codes == CODE_LATE).sum(axis=1)
+        self.absent = (codes == CODE_ABSENT).sum(axis=1)
+        self.partial = np.isin(codes, CODE_PARTIAL).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.rate = np.where(self.total > 0, self.attended / self.total * 100, 0.0)
+            self.absent_percentage = np.where(self.total > 0, self.absent / self.total * 100, 0.0)
+        self.max_streak, self.current_streak = consecutive_absent_streaks(codes)
+        self.warning = (self.max_streak >= WARNING_CONSECUTIVE_ABSENT) | \
+                       (self.absent_percentage > WARNING_ABSENT_PERCENTAGE)
+
+        # 学生 × 科目 × ステータス の回数 (記録のあるセルだけを (学生, 科目, コード) の番号にして数える)
+        n_students, n_subjects = codes.shape[0], len(self.subject_ids)
+        session_subject_idx = np.searchsorted(self.subject_ids, self.session_subjects)
+        rows, sessions = np.nonzero(recorded)
+        cells = (rows * n_subjects + session_subject_idx[sessions]) * N_CODES + codes[rows, sessions]
+        counts = np.bincount(cells, minlength=n_students * n_subjects * N_CODES) \
+            .reshape(n_students, n_subjects, N_CODES).astype(np.int32)
+        # コード0 (記録なし) は科目の授業回数から記録のある回数を引く
+        sessions_per_subject = np.bincount(session_subject_idx, minlength=n_subjects)
+        counts[:, :, CODE_NONE] = sessions_per_subject - counts[:, :, 1:].sum(axis=2)
+        self.student_subject_counts = counts
+
+    # --- 参照用ヘルパー ---
+
+    def student_row(self, student_no):
+        """学籍番号の集計結果を辞書で返す (記録がない学生は0件)"""
+        i = self.student_index.get(student_no)
+        if i is None:
+            return {'総実施回数': 0, '出席回数': 0, '遅刻回数': 0, '欠席回数': 0, '途中入退室回数': 0,
+                    '出席率': 0.0, '欠席率': 0.0, '最大連続欠席': 0, '現在連続欠席': 0, 'is_warning': False}
+        return {
+            '総実施回数': int(self.total[i]),
+            '出席回数': int(self.attended[i]),
+            '遅刻回数': int(self.late[i]),
+            '欠席回数': int(self.absent[i]),
+            '途中入退室回数': int(self.partial[i]),
+            '出席率': round(float(self.rate[i]), 2),
+            '欠席率': round(float(self.absent_percentage[i]), 2),
+            '最大連続欠席': int(self.max_streak[i]),
+            '現在連続欠席': int(self.current_streak[i]),
+            'is_warning': bool(self.warning[i]),
+        }
+
+    def subject_row(self, subject_id):
+        """科目ごとの 総実施回数(記録のある授業回×学生) / 出席回数 / 出席率 を返す"""
+        j = self.subject_index.get(subject_id)
+        if j is None:
+            return {'総実施回数': 0, '出席回数': 0, '出席率': 0.0}
+        counts = self.student_subject_counts[:, j, :]
+        total = int(counts[:, 1:].sum())
+        attended = int(counts[:, CODE_PRESENT].sum())
+        return {
+            '総実施回数': total,
+            '出席回数': attended,
+            '出席率': round(attended / total * 100, 2) if total > 0 else 0,
+        }
+
+    def student_subject_row(self, student_no, subject_id):
+        """学生 × 科目 の (出席回数, 欠席回数, 記録のある授業回数) を返す"""
+        i = self.student_index.get(student_no)
+        j = self.subject_index.get(subject_id)
+        if i is None or j is None:
+            return 0, 0, 0
+        counts = self.student_subject_counts[i, j]
+        return int(counts[CODE_PRESENT]), int(counts[CODE_ABSENT]), int(counts[1:].sum())
+
+
+def _period_order(schedule_id):
+    """週時間割ID (年度-学科-期-曜日-時限) の並び順: 時限、同じ時限はIDの順"""
+    parts = schedule_id.split('-')
+    return (int(parts[4]) if len(parts) == 5 and parts[4].isdigit() else 0), schedule_id
+
+
+def build_snapshot(student_ids, records):
+    """
+    学籍番号の一覧と (学生番号, 記録日, 週時間割ID, 授業科目ID, ステータス) の行から スナップショットを作る。
+    授業回は (記録日, 週時間割ID) 単位 (同じ日・同じ科目でも学科や時限が違えば別の授業回) で、日付・時限の順に並べる。
+    集計の対象にする期の記録だけを渡すこと (絞り込みは呼び出し側で行う)。
+    """
+    student_ids = np.asarray(sorted(student_ids), dtype=np.int64)
+    rows = [r for r in records if r[1] is not None and r[2] and r[3] is not None]
+    n = len(rows)
+    if not n or not len(student_ids):
+        codes = np.zeros((len(student_ids), 0), dtype=np.int8)
+        return AttendanceSnapshot(student_ids, [], np.zeros(0, dtype=np.int64), codes)
+
+    # 週時間割IDは時限順の番号に置き換える (同じ日の授業回を時限順に並べ、連続欠席が記録の順序によらないように)
+    schedule_codes = {schedule_id: i for i, schedule_id in enumerate(sorted({r[2] for r in rows}, key=_period_order))}
+    rec_students = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+    rec_days = np.fromiter((r[1].toordinal() for r in rows), dtype=np.int64, count=n)
+    rec_schedules = np.fromiter((schedule_codes[r[2]] for r in rows), dtype=np.int64, count=n)
+    rec_subjects = np.fromiter((r[3] for r in rows), dtype=np.int64, count=n)
+    rec_codes = np.fromiter((STATUS_CODES.get(r[4], CODE_NONE) for r in rows), dtype=np.int8, count=n)
+
+    # (記録日, 週時間割ID) を1つの整数キーにまとめて授業回番号を振る
+    width = len(schedule_codes)
+    session_key = rec_days * width + rec_schedules
+    unique_keys, first, rec_sessions = np.unique(session_key, return_index=True, return_inverse=True)
+    session_subjects = rec_subjects[first]
+    schedule_ids = list(schedule_codes)
+    session_keys = [(date.fromordinal(int(k // width)), schedule_ids[int(k % width)]) for k in unique_keys]
+
+    # 名簿にない学生番号の記録は除外する
+    pos = np.clip(np.searchsorted(student_ids, rec_students), 0, len(student_ids) - 1)
+    known = student_ids[pos] == rec_students
+
+    codes = np.zeros((len(student_ids), len(unique_keys)), dtype=np.int8)
+    # 同じセルに複数記録がある場合は優先度の高い(値の大きい)コードを残す
+    np.maximum.at(codes, (pos[known], rec_sessions[known]), rec_codes[known])
+    return AttendanceSnapshot(student_ids, session_keys, session_subjects, codes)
@@ -0,0 +1,96 @@
+# api_benchmark.py (読み取りAPI v1 と HTMLページの比較)
+#
+# 同じデータを返す HTML ページと /api/v1 (JSON / MessagePack) を、アプリをこのプロセス内で動かして取得し、
+# 応答サイズ (非圧縮 / gzip) とリクエスト1回あたりのCPU時間を比べる。
+# API はキーセットページングで全ページを辿った合計を1回分として数える。
+#
+# 実行例:
+#   DATABASE_URL=sqlite:///school.db python api_benchmark.py --repeat 5
+#
+# CPU時間は time.process_time の差分 (DBの問い合わせとテンプレート/シリアライズを含む)。
+
+import argparse
+import gzip
+import statistics
+import time
+
+from main import create_app
+
+# (名前, HTMLページ, API のパス)
+COMPARISONS = [
+    ('学生別出席率', '/student_attendance_rate', '/api/v1/rates'),
+    ('警告対象学生', '/student_attendance_rate', '/api/v1/warnings'),
+    ('時間割', '/timetable', '/api/v1/timetable'),
+    ('全ログ', '/logs', '/api/v1/attendance?from=2025-04-01&to=2026-03-31'),
+]
+FORMATS = {
+    'json': {'Accept': 'application/json'},
+    'msgpack': {'Accept': 'application/msgpack'},
+}
+
+
+def fetch_html(client, path):
+    """HTMLページを取得して (本文, CPU秒) を返す (ストリーミング応答も最後まで読む)"""
+    started = time.process_time()
+    response = client.get(path)
+    body = response.get_data()
+    elapsed = time.process_time() - started
+    if response.status_code != 200:
+        raise RuntimeError(f"{path}: HTTP {response.status_code}")
+    return body, elapsed
+
+
+def fetch_api(client, path, headers, limit):
+    """API を next がなくなるまで辿り、(本文の合計バイト列, CPU秒, 行数) を返す"""
+    import msgpack
+    import json
+    bodies = []
+    rows = 0
+    cursor = None
+    separator = '&' if '?' in path else '?'
+    started = time.process_time()
+    while True:
+        url = f"{path}{separator}limit={limit}" + (f"&after={cursor}" if cursor else '')
+        response = client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url}: HTTP {response.status_code}")
+        body = response.get_data()
+        bodies.append(body)
+        payload = msgpack.unpackb(body) if response.mimetype == 'application/msgpack' else json.loads(body)
+        rows += len(payload['rows'])
+        cursor = payload['next']
+        if not cursor:
+            break
+    return b''.join(bodies), time.process_time() - started, rows
+
+
+def measure(fetch, repeat):
+    """repeat 回取得して、(最後の本文, CPU秒の中央値, 付加情報) を返す"""
+    results = [fetch() for _ in range(repeat)]
+    return results[-1][0], statistics.median(r[1] for r in results), results[-1][2:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='読み取りAPI v1 と HTMLページの応答サイズ・CPU時間の比較')
+    parser.add_argument('--repeat', type=int, default=3, help='各URLの取得回数 (CPU時間は中央値)')
+    parser.add_argument('--limit', type=int, default=1000, help='APIの1ページの件数')
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    # 集計スナップショットなどのキャッシュを温めてから計測する
+    for _, html_path, api_path in COMPARISONS:
+        client.get(html_path)
+        client.get(api_path)
+
+    print(f"{'対象':<12} {'形式':<8} {'行数':>7} {'バイト':>11} {'gzip':>10} {'CPU ms':>9}")
+    for name, html_path, api_path in COMPARISONS:
+        body, cpu, _ = measure(lambda: fetch_html(client, html_path), args.repeat)
+        print(f"{name:<12} {'html':<8} {'':>7} {len(body):>11} {len(gzip.compress(body)):>10} {cpu * 1000:>9.1f}")
+        for fmt, headers in FORMATS.items():
+            body, cpu, (rows,) = measure(lambda: fetch_api(client, api_path, headers, args.limit), args.repeat)
+            print(f"{'':<12} {fmt:<8} {rows:>7} {len(body):>11} {len(gzip.compress(body)):>10} {cpu * 1000:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
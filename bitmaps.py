@@ -0,0 +1,163 @@
+# bitmaps.py (出席ビットマップ)
+#
+# (学生, 期) ごとに、ステータス別 (出席 / 遅刻 / 途中入退室 / 欠席) のビット列を持つ。
+# ビット位置は授業回の通し番号 (記録日と時限から SessionCalendar で計算) で、出席率・連続欠席・
+# 「今月の3限を全部欠席した学生」のような学生をまたぐ集合演算をビット演算だけで行う。
+# 通し番号は期ごとに、その期の開始日を起算日として数える (ビット列も (学生, 期) ごと)。
+# DBアクセスは行わない。永続化 (出席ビットマップ テーブル) と記録からの更新は main.py 側で行う。
+
+from datetime import timedelta
+
+# ステータス → ビット列の種別
+STATUS_KINDS = {
+    '出席': 'present',
+    '遅刻': 'late',
+    '途中入室': 'partial',
+    '途中退室': 'partial',
+    '早退': 'partial',
+    '欠席': 'absent',
+}
+# 同じ授業回に複数の記録がある場合は後ろの種別を優先する (analytics.STATUS_CODES と同じ順序)
+KINDS = ('present', 'late', 'partial', 'absent')
+
+
+class SessionCalendar:
+    """
+    授業回の通し番号の付け方 (1つの期分)。
+    通し番号 = (記録日 - 起算日) の日数 × 1日の時限数 + (時限 - 1)
+    起算日は期の開始日、1日の時限数は時限設定の最大の時限 (どちらかが変わったらビットマップを作り直す)。
+    """
+
+    __slots__ = ('start', 'periods')
+
+    def __init__(self, start, periods):
+        self.start = start
+        self.periods = periods
+
+    def ordinal(self, day, period):
+        """記録日と時限から授業回の通し番号を返す。起算日より前や時限の範囲外は ValueError"""
+        if not 1 <= period <= self.periods:
+            raise ValueError(f"時限が範囲外です: {period}")
+        days = (day - self.start).days
+        if days < 0:
+            raise ValueError(f"期の開始日 {self.start} より前の記録日です: {day}")
+        return days * self.periods + period - 1
+
+    def session(self, ordinal):
+        """通し番号から (記録日, 時限) を返す"""
+        days, period = divmod(ordinal, self.periods)
+        return self.start + timedelta(days=days), period + 1
+
+    def period_mask(self, start, end, period):
+        """start〜end (両端を含む) の各日の指定時限のビットを立てたマスクを返す"""
+        if not 1 <= period <= self.periods:
+            return 0
+        mask = 0
+        day = max(start, self.start)
+        while day <= end:
+            mask |= 1 << self.ordinal(day, period)
+            day += timedelta(days=1)
+        return mask
+
+
+def iter_bits(value):
+    """立っているビットの位置を小さい順に返す"""
+    while value:
+        low = value & -value
+        yield low.bit_length() - 1
+        value ^= low
+
+
+class AttendanceBitmap:
+    """1人・1期分のステータス別ビット列 (Python の int をビット列として使う)"""
+
+    __slots__ = KINDS
+
+    def __init__(self, present=0, late=0, partial=0, absent=0):
+        self.present = present
+        self.late = late
+        self.partial = partial
+        self.absent = absent
+
+    # --- 永続化 ---
+
+    @classmethod
+    def from_bytes(cls, base, present, late, partial, absent):
+        """起点 (ビット位置) と種別ごとのバイト列から復元する"""
+        return cls(*(int.from_bytes(b or b'', 'little') << base for b in (present, late, partial, absent)))
+
+    def to_bytes(self):
+        """(起点, 出席, 遅刻, 途中, 欠席) を返す。起点より前は全て0なので、起点以降だけをバイト列にする"""
+        recorded = self.recorded
+        base = ((recorded & -recorded).bit_length() - 1) & ~7 if recorded else 0
+        return (base,) + tuple(
+            (value >> base).to_bytes(((value >> base).bit_length() + 7) // 8, 'little')
+            for value in (self.present, self.late, self.partial, self.absent))
+
+    # --- 更新 ---
+
+    @property
+    def recorded(self):
+        return self.present | self.late | self.partial | self.absent
+
+    def kind_at(self, ordinal):
+        """その授業回の種別 (記録なしは None)"""
+        bit = 1 << ordinal
+        for kind in reversed(KINDS):
+            if getattr(self, kind) & bit:
+                return kind
+        return None
+
+    def set(self, ordinal, status):
+        """
+        授業回にステータスを重ねる。同じ授業回の記録をまとめるときに使い、優先度の高い種別を残す
+        (優先度の高い種別が既にあれば何もせず、低い種別は消す)。記録の順序によらず同じ結果になる。
+        """
+        kind = STATUS_KINDS.get(status)
+        if kind is None:
+            return
+        bit = 1 << ordinal
+        rank = KINDS.index(kind)
+        if any(getattr(self, k) & bit for k in KINDS[rank + 1:]):
+            return
+        for k in KINDS[:rank]:
+            setattr(self, k, getattr(self, k) & ~bit)
+        setattr(self, kind, getattr(self, kind) | bit)
+
+    def assign(self, ordinal, statuses):
+        """
+        授業回の種別を、その授業回の全ての記録のステータスから決め直す (記録がなければ消す)。
+        記録の追加・変更・削除のたびにこれで反映すると、記録から作り直した場合と同じになる。
+        """
+        bit = ~(1 << ordinal)
+        for kind in KINDS:
+            setattr(self, kind, getattr(self, kind) & bit)
+        for status in statuses:
+            self.set(ordinal, status)
+
+    # --- 集計 ---
+
+    def counts(self, mask=-1):
+        """mask の範囲の種別ごとの回数"""
+        return {kind: (getattr(self, kind) & mask).bit_count() for kind in KINDS}
+
+    def rate(self, mask=-1):
+        """出席率 (%) = 出席 / 記録のある授業回"""
+        total = (self.recorded & mask).bit_count()
+        return round((self.present & mask).bit_count() / total * 100, 2) if total else 0.0
+
+    def streaks(self):
+        """(最大連続欠席, 現在の連続欠席)。記録のない授業回は連続を途切れさせない"""
+        longest = current = 0
+        for position in iter_bits(self.recorded):
+            if self.absent >> position & 1:
+                current += 1
+                longest = max(longest, current)
+            else:
+                current = 0
+        return longest, current
+
+    def absent_in_every(self, mask):
+        """mask の範囲で記録のある授業回が1つ以上あり、その全てが欠席なら True"""
+        recorded = self.recorded & mask
+        return bool(recorded) and (self.absent & recorded) == recorded
@@ -0,0 +1,213 @@
+# gateway.py (カードリーダー用 asyncio ゲートウェイ)
+#
+# 多数のリーダーからの常時接続 (1行1イベントの JSON Lines over TCP) を1プロセスで受け、
+# スキャンをまとめて main.record_scans に渡して一括書き込みする。
+#
+# 起動例: python gateway.py --port 9100
+#
+# プロトコル:
+#   リーダー → ゲートウェイ: {"hello": "R-3301-1"}   (任意。機器IDを名乗ると seq による同期が有効になる)
+#   ゲートウェイ → リーダー: {"cursor": 欠番なく受信済みの最大seq}   (機器はこれより後のイベントから再送する)
+#   リーダー → ゲートウェイ: {"seq": 102, "student_no": 222521301, "timestamp": "2025-10-20T08:45:12", "kind": "in"}
+#   ゲートウェイ → リーダー: {"ack": 件数, "rejected": 件数, "cursor": 欠番なく受信済みの最大seq}
+#                            ack は書き込みが完了したイベント数、rejected は不正なイベントや名簿にない学籍番号のため
+#                            捨てたイベント数 (再送不要)。seq 付きの場合は duplicates (受信済みのため捨てた件数) と
+#                            pending (欠番より後のため保留した件数) も返す。保留したイベントはゲートウェイ側に
+#                            保存せず捨てるので、リーダーは ack を受けても cursor より後のイベントを消さずに
+#                            cursor の続きから再送する
+#                            {"error": "...", "count": 件数}   (書き込みに失敗したイベント数。リーダーは再送する)
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from main import create_app, db, get_device_cursor, get_roster, parse_scan_event, record_device_events, record_scans
+
+logger = logging.getLogger('gateway')
+
+
+class ReaderConnection:
+    """1台のリーダーとの接続"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.peer = writer.get_extra_info('peername')
+        self.device_id = None
+
+    def send(self, message):
+        if self.writer.is_closing():
+            return
+        self.writer.write((json.dumps(message, ensure_ascii=False) + '\n').encode())
+
+
+class ScanGateway:
+    def __init__(self, app, batch_size=500, batch_interval=0.05, queue_size=20000):
+        self.app = app
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        # キューが満杯になると読み込みが止まり、TCPのフロー制御でリーダー側が待たされる
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        # DBへの書き込みは1スレッドで直列に行う (SQLiteの単一ライターに合わせる)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scan-writer')
+        self.connections = 0
+        self.written = 0
+        self.batches = 0
+
+    async def handle_reader(self, reader, writer):
+        conn = ReaderConnection(writer)
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    conn.send({"error": "JSONとして解釈できません。", "count": 1})
+                    continue
+                if 'hello' in event:
+                    conn.device_id = str(event['hello'])
+                    cursor = await asyncio.get_running_loop().run_in_executor(
+                        self.executor, self._cursor, conn.device_id)
+                    conn.send({"cursor": cursor})
+                    continue
+                await self.queue.put((conn, event))
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    def _cursor(self, device_id):
+        with self.app.app_context():
+            return get_device_cursor(device_id)
+
+    def _write(self, batch):
+        """
+        バッチを1トランザクションで書き込み、{接続: 結果} を返す。
+        失敗した場合は接続ごとのトランザクションで書き込み直し、書き込めない不正なイベントを送った接続だけを
+        {"error", "count"} とする (他の接続のイベントまで巻き込んで再送させない)。
+        """
+        with self.app.app_context():
+            try:
+                results = self._write_batch(batch)
+                db.session.commit()
+                return results
+            except Exception as e:
+                db.session.rollback()
+                logger.warning(f"一括書き込みに失敗したため接続ごとに書き込み直します ({len(batch)}件): {e}")
+
+            by_conn = {}
+            for conn, event in batch:
+                by_conn.setdefault(conn, []).append((conn, event))
+            results = {}
+            for conn, events in by_conn.items():
+                try:
+                    results.update(self._write_batch(events))
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"書き込みに失敗しました ({conn.peer} / {len(events)}件): {e}")
+                    results[conn] = {"error": "書き込みに失敗しました。", "count": len(events)}
+            return results
+
+    def _write_batch(self, batch):
+        """
+        接続ごとのイベントを書き込み、{接続: 結果} を返す (コミットは呼び出し側)。
+        機器IDと seq のあるイベントは接続ごとに record_device_events で (同じ機器IDの接続が複数あれば順に)、
+        それ以外は不正なイベントと名簿にない学籍番号を接続ごとに除いてから、まとめて1回の record_scans で書き込む。
+        """
+        roster = get_roster()
+        results, plain_events, device_events = {}, [], {}
+        for conn, event in batch:
+            result = results.setdefault(conn, {'ack': 0, 'rejected': 0})
+            if conn.device_id and 'seq' in event:
+                device_events.setdefault(conn, []).append(event)
+                continue
+            try:
+                student_no = parse_scan_event(event)[0]
+            except ValueError as e:
+                logger.warning(str(e))
+                result['rejected'] += 1
+                continue
+            if roster.lookup(student_no) is None:
+                result['rejected'] += 1
+                continue
+            plain_events.append(event)
+            result['ack'] += 1
+        for conn, events in device_events.items():
+            device = record_device_events(conn.device_id, events)
+            result = results[conn]
+            result['ack'] += device['accepted']
+            result['rejected'] += device['rejected']
+            result.update(cursor=device['cursor'], duplicates=device['duplicates'], pending=device['pending'])
+        if plain_events:
+            record_scans(plain_events, commit=False)
+        return results
+
+    async def batch_writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            # 最初のイベントから batch_interval だけ待って溜まった分をまとめる
+            deadline = loop.time() + self.batch_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    await asyncio.sleep(min(remaining, 0.005))
+
+            try:
+                results = await loop.run_in_executor(self.executor, self._write, batch)
+            except Exception as e:
+                logger.error(f"一括書き込みに失敗しました ({len(batch)}件): {e}")
+                for conn, n in Counter(conn for conn, _ in batch).items():
+                    conn.send({"error": "書き込みに失敗しました。", "count": n})
+                continue
+            self.written += sum(result.get('ack', 0) for result in results.values())
+            self.batches += 1
+            for conn, result in results.items():
+                conn.send(result)
+
+    async def report_stats(self, interval=10):
+        last, last_time = 0, time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            rate = (self.written - last) / (now - last_time)
+            logger.info(f"接続 {self.connections} / 書き込み {self.written}件 ({self.batches}バッチ) / {rate:.0f}件/秒 / 待ち {self.queue.qsize()}")
+            last, last_time = self.written, now
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_reader, host, port, limit=64 * 1024)
+        logger.info(f"ゲートウェイ起動: {host}:{port} (バッチ {self.batch_size}件 / {self.batch_interval * 1000:.0f}ms)")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.batch_writer(), self.report_stats())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='カードリーダー用 asyncio ゲートウェイ')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--batch-interval-ms', type=int, default=50)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    gateway = ScanGateway(create_app(), args.batch_size, args.batch_interval_ms / 1000)
+    try:
+        asyncio.run(gateway.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# gunicorn.conf.py (Render/本番用 Gunicorn 設定)
+# 起動例: gunicorn -c gunicorn.conf.py wsgi:app
+#
+# preload_app により親プロセスでアプリを1回だけ読み込み、ワーカーはそこから fork する。
+# 接続プールは fork 後にワーカーごとに作り直す。
+
+import os
+
+preload_app = True
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+
+def on_starting(server):
+    """
+    親プロセスで1回だけ、教室の在室数カウンタの入退室ログからの再集計と、
+    前回の起動中に終わらなかったバックグラウンドジョブの「失敗」への更新を行う。
+    スキーマは flask db upgrade (マイグレーション) で作る。INIT_DB_ON_START=true のときだけ
+    init_db() でテーブル作成と初期データ投入も行う (マイグレーションを使わない開発環境向け)。
+    """
+    from main import db, init_db, fail_interrupted_jobs, reconcile_room_occupancy
+    from wsgi import app
+    with app.app_context():
+        if os.environ.get('INIT_DB_ON_START', 'false').lower() == 'true':
+            init_db()
+        try:
+            reconcile_room_occupancy()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"在室数の再集計に失敗しました: {e}")
+        try:
+            count = fail_interrupted_jobs()
+            if count:
+                app.logger.warning(f"中断されたバックグラウンドジョブ {count}件を失敗にしました")
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"中断されたジョブの整理に失敗しました: {e}")
+        # 親プロセスで開いた接続をワーカーに引き継がない
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def post_fork(server, worker):
+    """fork 後、親から引き継いだ接続プールを破棄する"""
+    from main import db
+    from wsgi import app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,288 @@
+# load_test.py (授業開始時の負荷試験)
+#
+# 1限開始前後の入室ラッシュを、名簿と時間割に基づく到着分布 (通常入室・遅刻・途中退室と再入室) で再現し、
+# 入室記録の受信 (/api/scans) とダッシュボード画面の閲覧を同時に流して、
+# スループット・遅延 (p50/p95/p99)・エラー率・DBのロック待ちを計測する。
+# 閾値を超えた場合は終了コード 1 を返すため、学期前の容量確認の合否判定に使える。
+#
+# 実行例:
+#   gunicorn -c gunicorn.conf.py wsgi:app &
+#   python load_test.py --url http://127.0.0.1:8000 --readers 100 --speed 60 --dashboard-users 10
+#
+# 名簿と時間割は DATABASE_URL から読み込む (サーバーと同じDBを指定する)。
+# --seed-students を指定すると、対象曜日に授業のある学科・期へ試験用の学生を追加してから実行する。
+
+import argparse
+import http.client
+import json
+import random
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from urllib.parse import urlsplit
+
+from reader_simulator import arrival_events, percentile
+
+DEFAULT_PAGES = ['/', '/absent-check', '/attendance_rate', '/student_attendance_rate', '/raspi_logs']
+SEED_STUDENT_BASE = 900000000
+
+
+def load_plan(day, seed_students):
+    """
+    DBから名簿と、その日の1限の開始時刻を読み込む。
+    seed_students > 0 なら、その曜日に授業のある学科・期に試験用の学生を追加する。
+    """
+    from main import create_app, db, TimeTable, 週時間割, 学生マスタ
+    app = create_app()
+    with app.app_context():
+        first = db.session.query(TimeTable).order_by(TimeTable.時限).first()
+        if first is None:
+            raise SystemExit("TimeTable が空です。先に flask init-db を実行してください。")
+        if seed_students:
+            partitions = sorted(set(db.session.query(週時間割.学科ID, 週時間割.期).filter(
+                週時間割.曜日 == day.weekday() + 1, 週時間割.年度 == 2025).all()))
+            if not partitions:
+                raise SystemExit(f"{day} の曜日には授業がありません。")
+            existing = {no for (no,) in db.session.query(学生マスタ.学籍番号)
+                        .filter(学生マスタ.学籍番号 >= SEED_STUDENT_BASE).all()}
+            rows = [{'学籍番号': SEED_STUDENT_BASE + i, '氏名': f'負荷試験{i}', '学年': 1,
+                     '学科ID': partitions[i % len(partitions)][0], '期': partitions[i % len(partitions)][1]}
+                    for i in range(seed_students) if SEED_STUDENT_BASE + i not in existing]
+            if rows:
+                db.session.execute(db.insert(学生マスタ), rows)
+                db.session.commit()
+            print(f"試験用の学生を {len(rows)}名 追加しました。")
+        roster = [no for (no,) in db.session.query(学生マスタ.学籍番号).order_by(学生マスタ.学籍番号).all()]
+        # 相対パスの SQLite は Flask-SQLAlchemy が instance/ 以下に解決するため、設定値ではなくエンジンのURLを返す
+        return roster, first.開始時刻, db.engine.url
+
+
+class Stats:
+    """区分 (ingest / 各ページ) ごとの応答時間とエラー数"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.events = 0
+
+    def record(self, name, seconds, ok, events=0):
+        with self.lock:
+            self.latencies[name].append(seconds)
+            if not ok:
+                self.errors[name] += 1
+            elif events:
+                self.events += events
+
+
+class HttpClient:
+    """スレッドごとの keep-alive 接続"""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        """(ステータス, 本文) を返す。接続エラーはステータス 0"""
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        for attempt in range(2):
+            if self.conn is None:
+                cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+                self.conn = cls(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, body=body, headers=headers)
+                response = self.conn.getresponse()
+                return response.status, response.read()
+            except (OSError, http.client.HTTPException):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    return 0, b''
+        return 0, b''
+
+
+def reader_worker(args, events, sim_start, stats):
+    """1台のリーダー: 到着時刻どおりに (同時刻のものは batch_size 件までまとめて) POST する"""
+    client = HttpClient(args.url, args.timeout)
+    wall_start = time.perf_counter()
+    i = 0
+    while i < len(events):
+        offset = (datetime.fromisoformat(events[i]['timestamp']) - sim_start).total_seconds() / args.speed
+        delay = offset - (time.perf_counter() - wall_start)
+        if delay > 0:
+            time.sleep(delay)
+        # 送信時点で到着済みのイベントをまとめる
+        now = time.perf_counter() - wall_start
+        batch = [events[i]]
+        i += 1
+        while i < len(events) and len(batch) < args.batch_size and \
+                (datetime.fromisoformat(events[i]['timestamp']) - sim_start).total_seconds() / args.speed <= now:
+            batch.append(events[i])
+            i += 1
+        started = time.perf_counter()
+        status, body = client.request('POST', '/api/scans', json.dumps({'events': batch}))
+        stats.record('ingest', time.perf_counter() - started, status == 200, len(batch))
+
+
+def dashboard_worker(args, stop, stats, seed):
+    """ダッシュボード利用者: 画面を無作為に選んで一定間隔で開く"""
+    client = HttpClient(args.url, args.timeout)
+    rng = random.Random(seed)
+    while not stop.is_set():
+        page = rng.choice(args.pages)
+        started = time.perf_counter()
+        status, _ = client.request('GET', page)
+        # ログイン必須の画面はリダイレクトも正常とみなす
+        stats.record(page, time.perf_counter() - started, status in (200, 302))
+        stop.wait(rng.uniform(0.5, 1.5) * args.dashboard_interval)
+
+
+def lock_sampler(database_url, interval, stop, samples):
+    """
+    DBのロック待ちを定期的に計測する。database_url はアプリのエンジンのURL (sqlalchemy.engine.URL)。
+    PostgreSQL: ロック待ち中のセッション数 (pg_stat_activity)。
+    SQLite: 計測の時点で他の接続が書き込みロックを持っていたか (1/0)。待たずに BEGIN IMMEDIATE を試し、
+      取れた場合はすぐに ROLLBACK するため、計測自体がロックを持つのは1回あたり数マイクロ秒で、
+      サーバーの書き込みを待たせることはほぼない。
+    """
+    if database_url.get_backend_name() == 'sqlite':
+        conn = sqlite3.connect(database_url.database, timeout=0, isolation_level=None)
+        while not stop.is_set():
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+            except sqlite3.OperationalError:   # database is locked
+                samples.append(1)
+            else:
+                conn.execute('ROLLBACK')
+                samples.append(0)
+            stop.wait(interval)
+        conn.close()
+        return
+    from sqlalchemy import create_engine, text
+    engine = create_engine(database_url, pool_size=1)
+    with engine.connect() as conn:
+        while not stop.is_set():
+            samples.append(conn.execute(text(
+                "SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock'")).scalar())
+            conn.rollback()
+            stop.wait(interval)
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='授業開始時の負荷試験 (入室ラッシュ + ダッシュボード閲覧)')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='対象サーバーのURL')
+    parser.add_argument('--date', default=date.today().isoformat(), help='シミュレーションする日付 (授業のある曜日)')
+    parser.add_argument('--period-start', default=None, help='授業開始時刻 HH:MM (既定: TimeTable の1限)')
+    parser.add_argument('--students', type=int, default=0, help='使用する学生数 (0=名簿全員)')
+    parser.add_argument('--seed-students', type=int, default=0, help='試験前に追加する試験用の学生数')
+    parser.add_argument('--readers', type=int, default=50, help='仮想リーダー数 (同時に送信するスレッド数)')
+    parser.add_argument('--batch-size', type=int, default=20, help='リーダーが1回のPOSTにまとめる最大件数')
+    parser.add_argument('--speed', type=float, default=60.0, help='時間の圧縮率 (60 = 1分を1秒で再生)')
+    parser.add_argument('--dashboard-users', type=int, default=5, help='同時にダッシュボードを開く利用者数')
+    parser.add_argument('--dashboard-interval', type=float, default=2.0, help='利用者が画面を開く平均間隔 (秒)')
+    parser.add_argument('--pages', nargs='+', default=DEFAULT_PAGES, help='閲覧する画面のパス')
+    parser.add_argument('--timeout', type=float, default=30.0, help='HTTPタイムアウト (秒)')
+    parser.add_argument('--lock-interval', type=float, default=0.2, help='ロックの計測間隔 (秒)')
+    parser.add_argument('--seed', type=int, default=0)
+    # 合否判定の閾値
+    parser.add_argument('--max-ingest-p99-ms', type=float, default=1000.0)
+    parser.add_argument('--max-page-p95-ms', type=float, default=3000.0)
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='全リクエストに対するエラーの割合')
+    parser.add_argument('--min-throughput', type=float, default=0.0, help='最低スループット (イベント/秒)')
+    args = parser.parse_args()
+
+    day = date.fromisoformat(args.date)
+    roster, first_start, database_url = load_plan(day, args.seed_students)
+    if args.students:
+        roster = roster[:args.students]
+    start_time = datetime.strptime(args.period_start, '%H:%M').time() if args.period_start else first_start
+    period_start = datetime.combine(day, start_time)
+
+    # 学生を仮想リーダーに均等に割り当てる (教室の入口ごとにリーダーがある想定)
+    rng = random.Random(args.seed)
+    per_reader = [[] for _ in range(args.readers)]
+    for i, student_no in enumerate(roster):
+        per_reader[i % args.readers].extend(arrival_events(student_no, period_start, rng))
+    per_reader = [sorted(events, key=lambda e: e['timestamp']) for events in per_reader if events]
+    total = sum(len(events) for events in per_reader)
+    if not total:
+        raise SystemExit("送信するイベントがありません。")
+    sim_start = min(datetime.fromisoformat(events[0]['timestamp']) for events in per_reader)
+    print(f"仮想リーダー {len(per_reader)}台 / 学生 {len(roster)}名 / イベント {total}件 / "
+          f"開始 {period_start:%Y-%m-%d %H:%M} / 速度 x{args.speed} / 閲覧者 {args.dashboard_users}名")
+
+    stats = Stats()
+    stop = threading.Event()
+    lock_samples = []
+    background = [threading.Thread(target=lock_sampler, args=(database_url, args.lock_interval, stop, lock_samples),
+                                   daemon=True)]
+    background += [threading.Thread(target=dashboard_worker, args=(args, stop, stats, args.seed + i), daemon=True)
+                   for i in range(args.dashboard_users)]
+    readers = [threading.Thread(target=reader_worker, args=(args, events, sim_start, stats))
+               for events in per_reader]
+
+    started = time.perf_counter()
+    for thread in background + readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in background:
+        thread.join(timeout=args.timeout)
+
+    # --- 結果 ---
+    failures = []
+    print(f"\n経過 {elapsed:.2f}秒 / 受信 {stats.events}件 / {stats.events / elapsed:.0f}件/秒")
+    print(f"{'区分':<28}{'件数':>7}{'エラー':>7}{'p50ms':>9}{'p95ms':>9}{'p99ms':>9}{'平均ms':>9}")
+    requests = errors = 0
+    for name in ['ingest'] + sorted(k for k in stats.latencies if k != 'ingest'):
+        values = stats.latencies.get(name)
+        if not values:
+            continue
+        requests += len(values)
+        errors += stats.errors[name]
+        p50, p95, p99 = (percentile(values, p) * 1000 for p in (50, 95, 99))
+        print(f"{name:<28}{len(values):>7}{stats.errors[name]:>7}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}"
+              f"{statistics.mean(values) * 1000:>9.1f}")
+        if name == 'ingest' and p99 > args.max_ingest_p99_ms:
+            failures.append(f"受信の p99 {p99:.0f}ms > {args.max_ingest_p99_ms:.0f}ms")
+        if name != 'ingest' and p95 > args.max_page_p95_ms:
+            failures.append(f"{name} の p95 {p95:.0f}ms > {args.max_page_p95_ms:.0f}ms")
+
+    error_rate = errors / requests if requests else 0.0
+    print(f"エラー率 {error_rate * 100:.2f}% ({errors}/{requests})")
+    if error_rate > args.max_error_rate:
+        failures.append(f"エラー率 {error_rate * 100:.2f}% > {args.max_error_rate * 100:.2f}%")
+    throughput = stats.events / elapsed
+    if throughput < args.min_throughput:
+        failures.append(f"スループット {throughput:.0f}件/秒 < {args.min_throughput:.0f}件/秒")
+
+    if lock_samples:
+        if database_url.get_backend_name() == 'sqlite':
+            print(f"書き込みロック使用中 (SQLite) {sum(lock_samples)}/{len(lock_samples)}回 "
+                  f"({statistics.mean(lock_samples) * 100:.1f}%)")
+        else:
+            waiting = sum(1 for n in lock_samples if n)
+            print(f"ロック待ちセッション (PostgreSQL) 最大 {max(lock_samples)} / 平均 {statistics.mean(lock_samples):.2f} / "
+                  f"待ちありの計測 {waiting}/{len(lock_samples)}回")
+
+    if failures:
+        print("\n判定: 不合格")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n判定: 合格")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""attendance logical key unique
+
+Revision ID: 8f2d6b0c4a19
+Revises: 3c9a41d2e7b5
+Create Date: 2026-10-19 10:03:27.551930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f2d6b0c4a19'
+down_revision = '3c9a41d2e7b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('入退室_出席記録', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('記録種別', sa.String(length=10), nullable=True))
+
+    # 既存の自動欠席行・手動入力行に種別を付与する
+    op.execute("""UPDATE "入退室_出席記録" SET "記録種別" = '欠席' WHERE "備考" = '自動欠席判定'""")
+    op.execute("""UPDATE "入退室_出席記録" SET "記録種別" = '手動', "週時間割ID" = '' WHERE "備考" = '手動入力'""")
+
+    # 論理キーが重複している行を、最小の記録IDだけ残して削除する
+    op.execute("""
+        DELETE FROM "入退室_出席記録"
+        WHERE "記録種別" IS NOT NULL
+          AND "授業科目ID" IS NOT NULL
+          AND "週時間割ID" IS NOT NULL
+          AND "記録ID" NOT IN (
+              SELECT keep_id FROM (
+                  SELECT MIN("記録ID") AS keep_id
+                  FROM "入退室_出席記録"
+                  WHERE "記録種別" IS NOT NULL
+                  GROUP BY "学生番号", "記録日", "授業科目ID", "週時間割ID", "記録種別"
+              ) AS keep
+          )
+    """)
+
+    with op.batch_alter_table('入退室_出席記録', schema=None) as batch_op:
+        batch_op.create_index('uq_入退室_出席記録_論理キー',
+                              ['学生番号', '記録日', '授業科目ID', '週時間割ID', '記録種別'],
+                              unique=True,
+                              sqlite_where=sa.text('"記録種別" IS NOT NULL'),
+                              postgresql_where=sa.text('"記録種別" IS NOT NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('入退室_出席記録', schema=None) as batch_op:
+        batch_op.drop_index('uq_入退室_出席記録_論理キー')
+        batch_op.drop_column('記録種別')
@@ -0,0 +1,49 @@
+"""attendance logical key coalesce
+
+Revision ID: d9e2f4a6b813
+Revises: 4a7f1c9e2b85
+Create Date: 2026-10-20 09:12:40.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9e2f4a6b813'
+down_revision = '4a7f1c9e2b85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULL どうしは一意制約で別の値として扱われるため、科目・週時間割IDが NULL の行は重複を防げなかった。
+    # NULL を 0 / 空文字に置き換えた式で一意にする。先にその式で重複する行を、最小の記録IDだけ残して削除する
+    op.execute("""
+        DELETE FROM "入退室_出席記録"
+        WHERE "記録種別" IS NOT NULL
+          AND "記録ID" NOT IN (
+              SELECT keep_id FROM (
+                  SELECT MIN("記録ID") AS keep_id
+                  FROM "入退室_出席記録"
+                  WHERE "記録種別" IS NOT NULL
+                  GROUP BY "学生番号", "記録日", COALESCE("授業科目ID", 0), COALESCE("週時間割ID", ''), "記録種別"
+              ) AS keep
+          )
+    """)
+    op.drop_index('uq_入退室_出席記録_論理キー', table_name='入退室_出席記録')
+    op.create_index('uq_入退室_出席記録_論理キー', '入退室_出席記録',
+                    ['学生番号', '記録日', sa.text('COALESCE("授業科目ID", 0)'),
+                     sa.text('COALESCE("週時間割ID", \'\')'), '記録種別'],
+                    unique=True,
+                    sqlite_where=sa.text('"記録種別" IS NOT NULL'),
+                    postgresql_where=sa.text('"記録種別" IS NOT NULL'))
+
+
+def downgrade():
+    op.drop_index('uq_入退室_出席記録_論理キー', table_name='入退室_出席記録')
+    op.create_index('uq_入退室_出席記録_論理キー', '入退室_出席記録',
+                    ['学生番号', '記録日', '授業科目ID', '週時間割ID', '記録種別'],
+                    unique=True,
+                    sqlite_where=sa.text('"記録種別" IS NOT NULL'),
+                    postgresql_where=sa.text('"記録種別" IS NOT NULL'))
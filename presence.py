@@ -0,0 +1,72 @@
+# presence.py (在室時間の計算)
+#
+# 1コマ分の入退室区間 (入室日時, 退室日時) を時刻順に走査して重なりを併合し、
+# 授業の開始〜終了に切り詰めて実際の在室時間 (分) を求める。
+# 在室率 (在室時間 / 授業時間) から、設定した閾値に従ってステータスを決める。
+# DBアクセスは行わない。記録の読み込みと結果 (在室時間 テーブル) の保存は main.py 側で行う。
+
+from datetime import timedelta
+
+# 在室率の閾値 (既定値)。Config の PRESENCE_* で上書きできる
+DEFAULT_RATIOS = {
+    'present': 0.9,   # これ以上は「出席」
+    'late': 0.75,     # これ以上で、欠けているのが授業の冒頭だけなら「遅刻」
+    'absent': 0.5,    # これ未満は「欠席」
+}
+
+
+def merge_intervals(intervals, class_start, class_end):
+    """
+    [(入室日時 or None, 退室日時 or None), ...] を併合し、授業時間内の区間のリストを返す。
+    退室がない区間は授業終了まで、入室がない区間 (退室のみの記録) は授業開始からいたものとみなす。
+    """
+    clipped = []
+    for entry, exit_ in intervals:
+        if entry is None and exit_ is None:
+            continue
+        start = max(entry or class_start, class_start)
+        end = min(exit_ or class_end, class_end)
+        if start < end:
+            clipped.append((start, end))
+    clipped.sort()
+
+    merged = []
+    for start, end in clipped:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def total_minutes(merged):
+    """併合済みの区間の合計 (分、切り捨て)"""
+    return int(sum((end - start for start, end in merged), timedelta()).total_seconds() // 60)
+
+
+def derive_status(merged, class_start, class_end, ratios=None):
+    """併合済みの区間からステータスを決める (在室率と、欠けている時間帯の位置による)"""
+    ratios = ratios or DEFAULT_RATIOS
+    duration = (class_end - class_start).total_seconds()
+    if not merged or duration <= 0:
+        return '欠席'
+    ratio = sum((end - start).total_seconds() for start, end in merged) / duration
+    if ratio >= ratios['present']:
+        return '出席'
+    if ratio < ratios['absent']:
+        return '欠席'
+    arrived_late = merged[0][0] > class_start
+    left_early = merged[-1][1] < class_end
+    if arrived_late and not left_early and len(merged) == 1 and ratio >= ratios['late']:
+        return '遅刻'
+    return '途中入室' if arrived_late else '途中退室'
+
+
+def session_presence(intervals, class_start, class_end, ratios=None):
+    """1コマ分の (在室分, 授業分, ステータス, 併合後の区間数) を返す"""
+    merged = merge_intervals(intervals, class_start, class_end)
+    return (total_minutes(merged),
+            int((class_end - class_start).total_seconds() // 60),
+            derive_status(merged, class_start, class_end, ratios),
+            len(merged))
@@ -0,0 +1,143 @@
+# query_benchmark.py (よく使う問い合わせの組み立て・コンパイルのコスト比較)
+#
+# main.py の組み立て済みの文 (*_STATEMENT、bindparam で引数を渡す) と、同じ問い合わせを従来どおり
+# db.session.query で毎回組み立てた場合を比べる。
+#   組み立て: 式を作ってキャッシュキーを生成するまで (実行のたびに払うPython側のコスト)
+#   コンパイル: キャッシュがない場合の SQL 文字列へのコンパイル (参考値。キャッシュヒットなら払わない)
+#   実行: DB への問い合わせを含む1回あたりの時間
+# キャッシュにヒットすることの確認は tests/test_statement_cache.py で行う。
+#
+# 実行例:
+#   DATABASE_URL=sqlite:///school.db python query_benchmark.py --repeat 2000
+
+import argparse
+import sys
+import time
+from datetime import date
+
+from sqlalchemy import and_, func
+
+from main import (create_app, db, 入退室_出席記録, 学生マスタ, 学科, 期マスタ, 学生リスク状態, 週時間割,
+                  ABSENT_COUNTS_STATEMENT, ABSENT_STUDENTS_STATEMENT, STUDENT_SCHEDULES_STATEMENT,
+                  STUDENT_RECORDS_STATEMENT, WARNING_STATES_STATEMENT, SNAPSHOT_RECORDS_STATEMENT)
+
+
+# --- 従来の組み立て (組み立て済みの文にする前の各ページの問い合わせ) ---
+
+def legacy_absent_counts(dept_id, day):
+    return db.session.query(
+        学生マスタ.学籍番号,
+        学生マスタ.氏名,
+        学科.学科名,
+        期マスタ.期名,
+        func.count(入退室_出席記録.記録ID).label('absent_count')
+    ).join(学科, 学生マスタ.学科ID == 学科.学科ID) \
+     .join(期マスタ, 学生マスタ.期 == 期マスタ.期ID) \
+     .outerjoin(入退室_出席記録, and_(
+         入退室_出席記録.学生番号 == 学生マスタ.学籍番号,
+         入退室_出席記録.記録日 == day,
+         入退室_出席記録.ステータス == '欠席'
+     )) \
+     .filter(学生マスタ.学科ID == dept_id) \
+     .group_by(学生マスタ.学籍番号, 学生マスタ.氏名, 学科.学科名, 期マスタ.期名) \
+     .order_by(学生マスタ.学籍番号)
+
+
+def legacy_absent_students(day):
+    return db.session.query(
+        学生マスタ.学籍番号,
+        学生マスタ.氏名,
+        学科.学科名,
+        入退室_出席記録.授業科目ID,
+        入退室_出席記録.備考
+    ).join(入退室_出席記録, 入退室_出席記録.学生番号 == 学生マスタ.学籍番号) \
+     .join(学科, 学生マスタ.学科ID == 学科.学科ID) \
+     .filter(and_(入退室_出席記録.記録日 == day, 入退室_出席記録.ステータス == '欠席')) \
+     .order_by(学生マスタ.学籍番号)
+
+
+def legacy_student_schedules(dept_id, term_id):
+    return db.session.query(週時間割).filter(
+        and_(週時間割.年度 == 2025, 週時間割.学科ID == dept_id, 週時間割.期 == term_id))
+
+
+def legacy_student_records(student_no, subject_ids):
+    return db.session.query(入退室_出席記録.授業科目ID, 入退室_出席記録.記録日, 入退室_出席記録.ステータス).filter(
+        入退室_出席記録.学生番号 == student_no,
+        入退室_出席記録.授業科目ID.in_(subject_ids)
+    ).order_by(入退室_出席記録.記録日)
+
+
+def legacy_warning_states():
+    return db.session.query(
+        学生リスク状態.学籍番号,
+        学生マスタ.氏名,
+        学生リスク状態.現在連続欠席,
+        学生リスク状態.最大連続欠席,
+        学生リスク状態.出席回数,
+        学生リスク状態.欠席回数,
+        学生リスク状態.総回数,
+        学生リスク状態.警告開始日時
+    ).join(学生マスタ, 学生マスタ.学籍番号 == 学生リスク状態.学籍番号) \
+     .filter(学生リスク状態.警告.is_(True)) \
+     .order_by(学生リスク状態.学籍番号)
+
+
+def per_call(fn, repeat):
+    """fn を repeat 回実行した1回あたりのマイクロ秒"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='よく使う問い合わせの組み立て・コンパイル・実行時間の比較')
+    parser.add_argument('--repeat', type=int, default=1000, help='各計測の繰り返し回数')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        today = date.today()
+        student = db.session.query(学生マスタ).order_by(学生マスタ.学籍番号).first()
+        if student is None:
+            sys.exit('学生マスタが空です。')
+        schedules = db.session.execute(
+            STUDENT_SCHEDULES_STATEMENT, {'dept_id': student.学科ID, 'term_id': student.期}).scalars().all()
+        subject_ids = sorted({s.科目ID for s in schedules}) or [1]
+
+        # (名前, 従来の組み立て, 組み立て済みの文, 引数)
+        cases = [
+            ('欠席件数 (トップ)', legacy_absent_counts, ABSENT_COUNTS_STATEMENT,
+             {'dept_id': student.学科ID, 'day': today}),
+            ('欠席学生 (欠席確認)', legacy_absent_students, ABSENT_STUDENTS_STATEMENT, {'day': today}),
+            ('週時間割 (学生別)', legacy_student_schedules, STUDENT_SCHEDULES_STATEMENT,
+             {'dept_id': student.学科ID, 'term_id': student.期}),
+            ('学生の記録 (学生別)', legacy_student_records, STUDENT_RECORDS_STATEMENT,
+             {'student_no': student.学籍番号, 'subject_ids': subject_ids}),
+            ('警告学生', legacy_warning_states, WARNING_STATES_STATEMENT, {}),
+            ('スナップショット', lambda: db.session.query(入退室_出席記録.学生番号, 入退室_出席記録.記録日,
+                                                   入退室_出席記録.週時間割ID, 入退室_出席記録.授業科目ID,
+                                                   入退室_出席記録.ステータス)
+             .filter(入退室_出席記録.授業科目ID.isnot(None)),
+             SNAPSHOT_RECORDS_STATEMENT, {}),
+        ]
+        dialect = db.engine.dialect
+
+        print(f"{'問い合わせ':<14} {'方式':<8} {'組み立て µs':>12} {'コンパイル µs':>14} {'実行 µs':>10}")
+        for name, legacy, statement, params in cases:
+            legacy_statement = legacy(*params.values()).statement
+            rows = [
+                ('従来', per_call(lambda: legacy(*params.values()).statement._generate_cache_key(), args.repeat),
+                 per_call(lambda: legacy_statement.compile(dialect=dialect), args.repeat // 10 or 1),
+                 per_call(lambda: legacy(*params.values()).all(), args.repeat)),
+                ('組み立て済', per_call(lambda: statement._generate_cache_key(), args.repeat),
+                 per_call(lambda: statement.compile(dialect=dialect), args.repeat // 10 or 1),
+                 per_call(lambda: db.session.execute(statement, params).all(), args.repeat)),
+            ]
+            for i, (method, build, compile_, execute) in enumerate(rows):
+                print(f"{name if i == 0 else '':<14} {method:<8} {build:>12.1f} {compile_:>14.1f} {execute:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# reader_simulator.py (カードリーダー シミュレーター)
+#
+# 授業開始前後の入室ラッシュを、多数の仮想リーダーから gateway.py に再現送信し、
+# スループットと ack までの遅延を計測する。
+#
+# 実行例:
+#   python gateway.py --port 9100 &
+#   python reader_simulator.py --port 9100 --readers 300 --speed 60
+#
+# 名簿は DATABASE_URL の学生マスタから読み込む (名簿にない学籍番号は受信側で rejected になるため)。
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+
+def load_roster():
+    """学生マスタの学籍番号を読み込む"""
+    from main import create_app, db, 学生マスタ
+    app = create_app()
+    with app.app_context():
+        return [row[0] for row in db.session.query(学生マスタ.学籍番号).all()]
+
+
+def arrival_events(student_no, period_start, rng):
+    """
+    1人分の入退室イベントを作る。
+    大半は開始5分前を中心に正規分布で入室、一部は遅刻、一部は途中退室して再入室する。
+    """
+    r = rng.random()
+    if r < 0.03:
+        return []  # 欠席
+    if r < 0.13:
+        arrival = period_start + timedelta(minutes=rng.uniform(10, 25))  # 遅刻
+    else:
+        arrival = period_start + timedelta(minutes=min(rng.gauss(-5, 4), 9))
+    events = [(arrival, 'in')]
+    if rng.random() < 0.05:
+        leave = period_start + timedelta(minutes=rng.uniform(30, 60))
+        events.append((leave, 'out'))
+        events.append((leave + timedelta(minutes=rng.uniform(3, 15)), 'in'))
+    return [{'student_no': student_no, 'timestamp': ts.isoformat(timespec='seconds'), 'kind': kind}
+            for ts, kind in events]
+
+
+class VirtualReader:
+    def __init__(self, reader_id, events):
+        self.reader_id = reader_id
+        self.events = sorted(events, key=lambda e: e['timestamp'])
+        self.sent_at = []
+        self.latencies = []
+        self.acked = 0
+        self.rejected = 0
+        self.errors = 0
+
+    async def receive_acks(self, reader):
+        while self.acked + self.rejected + self.errors < len(self.events):
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            now = time.perf_counter()
+            # 応答済みの件数: 書き込んだ ack と、再送不要として捨てられた rejected / duplicates。エラーは count
+            acked = message.get('ack', 0)
+            rejected = message.get('rejected', 0) + message.get('duplicates', 0)
+            errors = 0 if 'ack' in message else message.get('count', 0)
+            done = self.acked + self.rejected + self.errors
+            for sent in self.sent_at[done:done + acked + rejected + errors]:
+                self.latencies.append(now - sent)
+            self.acked += acked
+            self.rejected += rejected
+            self.errors += errors
+
+    async def run(self, host, port, sim_start, speed):
+        reader, writer = await asyncio.open_connection(host, port)
+        receiver = asyncio.create_task(self.receive_acks(reader))
+        wall_start = time.perf_counter()
+        for event in self.events:
+            # シミュレーション時刻を speed 倍で進めて送信タイミングを再現する
+            offset = (datetime.fromisoformat(event['timestamp']) - sim_start).total_seconds() / speed
+            delay = offset - (time.perf_counter() - wall_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.sent_at.append(time.perf_counter())
+            writer.write((json.dumps(event) + '\n').encode())
+            await writer.drain()
+        try:
+            await asyncio.wait_for(receiver, timeout=30)
+        except asyncio.TimeoutError:
+            receiver.cancel()
+        writer.close()
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def simulate(args):
+    roster = load_roster()
+    if args.students:
+        roster = roster[:args.students]
+    rng = random.Random(args.seed)
+    day = date.fromisoformat(args.date)
+    period_start = datetime.combine(day, datetime.strptime(args.period_start, '%H:%M').time())
+
+    # 学生を仮想リーダーに均等に割り当てる (教室の入口ごとにリーダーがある想定)
+    per_reader = [[] for _ in range(args.readers)]
+    for i, student_no in enumerate(roster):
+        per_reader[i % args.readers].extend(arrival_events(student_no, period_start, rng))
+    readers = [VirtualReader(i, events) for i, events in enumerate(per_reader) if events]
+    total = sum(len(r.events) for r in readers)
+    sim_start = min(datetime.fromisoformat(r.events[0]['timestamp']) for r in readers)
+
+    print(f"仮想リーダー {len(readers)}台 / 学生 {len(roster)}名 / イベント {total}件 / 速度 x{args.speed}")
+    started = time.perf_counter()
+    await asyncio.gather(*(r.run(args.host, args.port, sim_start, args.speed) for r in readers))
+    elapsed = time.perf_counter() - started
+
+    latencies = [l for r in readers for l in r.latencies]
+    acked = sum(r.acked for r in readers)
+    rejected = sum(r.rejected for r in readers)
+    errors = sum(r.errors for r in readers)
+    print(f"経過 {elapsed:.2f}秒 / ack {acked}件 / rejected {rejected}件 / エラー {errors}件 / {acked / elapsed:.0f}件/秒")
+    if latencies:
+        print(f"ack遅延 p50 {percentile(latencies, 50) * 1000:.1f}ms / p95 {percentile(latencies, 95) * 1000:.1f}ms / "
+              f"p99 {percentile(latencies, 99) * 1000:.1f}ms / 平均 {statistics.mean(latencies) * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='カードリーダー シミュレーター')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--readers', type=int, default=200, help='仮想リーダー数')
+    parser.add_argument('--students', type=int, default=0, help='使用する学生数 (0=名簿全員)')
+    parser.add_argument('--date', default=date.today().isoformat(), help='シミュレーションする日付')
+    parser.add_argument('--period-start', default='08:50', help='授業開始時刻 (HH:MM)')
+    parser.add_argument('--speed', type=float, default=60.0, help='時間の圧縮率 (60 = 1分を1秒で再生)')
+    parser.add_argument('--seed', type=int, default=0)
+    asyncio.run(simulate(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
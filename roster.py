@@ -0,0 +1,123 @@
+# roster.py (学生名簿のメモリ内インデックス)
+#
+# 学生マスタを学籍番号順の配列 (array) に詰めて各ワーカーに保持し、
+# スキャン時の学籍番号チェックと、(学科ID, 期) ごとの受講学生の展開をDBなしで行う。
+# 画面の学生検索 (学籍番号の前方一致・氏名の部分一致) 用のインデックスもここに置く。
+# DBからの読み込みと版数による作り直しは main.py 側で行う。
+
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+# 学科ID / 期 / 学年 が NULL の場合の値
+MISSING = -1
+
+
+class RosterIndex:
+    """学籍番号 → (学科ID, 期, 学年) と、(学科ID, 期) → 学籍番号の昇順配列"""
+
+    __slots__ = ('version', '_numbers', '_depts', '_terms', '_grades', '_groups')
+
+    def __init__(self, rows, version=0):
+        """rows は (学籍番号, 学科ID, 期, 学年) の反復可能オブジェクト"""
+        self.version = version
+        self._numbers = array('q')
+        self._depts = array('h')
+        self._terms = array('h')
+        self._grades = array('h')
+        groups = {}
+        for number, dept, term, grade in sorted(rows, key=lambda r: r[0]):
+            dept = MISSING if dept is None else dept
+            term = MISSING if term is None else term
+            self._numbers.append(number)
+            self._depts.append(dept)
+            self._terms.append(term)
+            self._grades.append(MISSING if grade is None else grade)
+            groups.setdefault((dept, term), array('q')).append(number)
+        self._groups = groups
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def _position(self, number):
+        i = bisect_left(self._numbers, number)
+        if i < len(self._numbers) and self._numbers[i] == number:
+            return i
+        return None
+
+    def __contains__(self, number):
+        return self._position(number) is not None
+
+    def lookup(self, number):
+        """(学科ID, 期, 学年) を返す。名簿にない学籍番号は None"""
+        i = self._position(number)
+        if i is None:
+            return None
+        return self._depts[i], self._terms[i], self._grades[i]
+
+    def group(self, dept_id, term):
+        """(学科ID, 期) に属する学籍番号の昇順配列 (該当なしは空配列)"""
+        return self._groups.get((dept_id, term), array('q'))
+
+    def groups(self, dept_id=None, term=None):
+        """{(学科ID, 期): 学籍番号の昇順配列} を返す。学科ID / 期を指定するとそれに一致するものだけ"""
+        return {key: numbers for key, numbers in self._groups.items()
+                if (dept_id is None or key[0] == dept_id) and (term is None or key[1] == term)}
+
+    def nbytes(self):
+        """配列部分のおおよそのメモリ使用量 (バイト)"""
+        columns = (self._numbers, self._depts, self._terms, self._grades)
+        return sum(a.itemsize * len(a) for a in columns) + \
+            sum(a.itemsize * len(a) for a in self._groups.values())
+
+
+def normalize_name(text):
+    """
+    氏名検索用の正規化。NFKC で全角英数・半角カナをそろえ、カタカナをひらがなに寄せ、空白を除く。
+    (「タナカ」「ﾀﾅｶ」「たなか」が同じ文字列になる)
+    """
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return ''.join(chr(ord(c) - 0x60) if 'ァ' <= c <= 'ヶ' else c for c in text if not c.isspace())
+
+
+class StudentSearchIndex:
+    """学籍番号の前方一致 (文字列順の配列を二分探索) と氏名の部分一致で学生を引く"""
+
+    __slots__ = ('version', '_keys', '_numbers', '_names', '_normalized')
+
+    def __init__(self, rows, version=0):
+        """rows は (学籍番号, 氏名) の反復可能オブジェクト"""
+        self.version = version
+        # 前方一致の範囲が連続するよう、学籍番号を文字列として並べる
+        rows = sorted(rows, key=lambda r: str(r[0]))
+        self._keys = [str(number) for number, _ in rows]
+        self._numbers = [number for number, _ in rows]
+        self._names = [name or '' for _, name in rows]
+        self._normalized = [normalize_name(name) for name in self._names]
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def search(self, query, limit=20):
+        """
+        [(学籍番号, 氏名), ...] を最大 limit 件返す。
+        学籍番号の前方一致を先に、続けて氏名の部分一致を返す。空の検索語なら学籍番号順の先頭から返す。
+        """
+        query = unicodedata.normalize('NFKC', query or '').strip()
+        results = []
+        if query.isdigit() or not query:
+            i = bisect_left(self._keys, query)
+            while i < len(self._keys) and len(results) < limit and self._keys[i].startswith(query):
+                results.append((self._numbers[i], self._names[i]))
+                i += 1
+            if not query:
+                return results
+        needle = normalize_name(query)
+        if needle:
+            found = {number for number, _ in results}
+            for i, name in enumerate(self._normalized):
+                if len(results) >= limit:
+                    break
+                if needle in name and self._numbers[i] not in found:
+                    results.append((self._numbers[i], self._names[i]))
+        return results
@@ -0,0 +1,122 @@
+# conftest.py (合成データを入れたDBのフィクスチャ)
+#
+# 既定では一時ディレクトリの SQLite に合成データ (マスタ・学生・記録・出席ビットマップ・リスク状態) を1度だけ入れ、
+# テストごとにそのファイルを複製して使う (テストが書き込んでも他のテストに影響しない)。
+# QUERY_PLAN_DATABASE_URL に空の PostgreSQL などのURLを指定すると、そこに1度だけ入れて全テストで共有する。
+
+import os
+import random
+import shutil
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from main import (create_app, db, rebuild_attendance_bitmaps, rebuild_risk_states, TimeTable, 入退室_出席記録,
+                  学生マスタ, 学科, 授業科目, 教室, 曜日マスタ, 期マスタ, 週時間割)
+
+SYNTHETIC_RECORDS = 50000
+SYNTHETIC_DAY = datetime(2025, 6, 2, 17, 0)   # 合成データの中の月曜日 (判定・スキャンの基準日時)
+
+
+def pytest_addoption(parser):
+    parser.addoption('--update-query-plans', action='store_true',
+                     help='query_plans/ のスナップショットを今回の実行計画で書き直す')
+
+
+def seed_synthetic_data(rows, seed=0):
+    """空のDBに合成データ (マスタ・学生・rows 件の記録・出席ビットマップ・リスク状態) を入れる。乱数は seed で固定"""
+    rng = random.Random(seed)
+    db.session.execute(db.insert(曜日マスタ), [
+        {'曜日ID': i, '曜日名': f"{name}曜日"} for i, name in enumerate('月火水木金土日', start=1)])
+    # 合成データの記録は各学生の期の時間割で1年分あるため、期の期間はどれも2025年度の1年間とする
+    db.session.execute(db.insert(期マスタ), [{'期ID': i, '期名': f"{i}期", '開始日': date(2025, 4, 1),
+                                              '終了日': date(2026, 3, 31)} for i in range(1, 5)])
+    db.session.execute(db.insert(学科), [{'学科ID': i, '学科名': f"学科{i}"} for i in range(1, 4)])
+    db.session.execute(db.insert(教室), [{'教室ID': i, '教室名': f"教室{i}", '収容人数': 40} for i in range(1, 31)])
+    db.session.execute(db.insert(TimeTable), [
+        {'時限': i, '開始時刻': time(8 + (i - 1) * 2, 50), '終了時刻': time(10 + (i - 1) * 2, 20)} for i in range(1, 6)])
+    db.session.execute(db.insert(授業科目), [
+        {'授業科目ID': i, '授業科目名': f"科目{i}", '学科ID': i % 3 + 1, '単位': 2, '開講期': '1,2'}
+        for i in range(1, 61)])
+    schedules = [{'年度': 2025, '学科ID': dept, '期': term, '曜日': weekday, '時限': period,
+                  '科目ID': rng.choice([s for s in range(1, 61) if s % 3 + 1 == dept]), '教室ID': rng.randint(1, 30)}
+                 for dept in range(1, 4) for term in range(1, 5) for weekday in range(1, 6) for period in range(1, 6)]
+    db.session.execute(db.insert(週時間割), schedules)
+    students = [{'学籍番号': 250000000 + i, '氏名': f"学生{i}", '学年': 1 + i % 5, '学科ID': 1 + i % 3,
+                 '期': 1 + i // 3 % 4} for i in range(600)]
+    db.session.execute(db.insert(学生マスタ), students)
+
+    by_group = {}
+    for s in schedules:
+        by_group.setdefault((s['学科ID'], s['期'], s['曜日']), []).append(s)
+    days = [d for d in (date(2025, 4, 7) + timedelta(days=i) for i in range(300)) if d.weekday() < 5]
+    records = []
+    keys = set()
+    while len(records) < rows:
+        student = rng.choice(students)
+        day = rng.choice(days)
+        schedule = rng.choice(by_group[(student['学科ID'], student['期'], day.weekday() + 1)])
+        status = rng.choices(['出席', '遅刻', '途中退室', '欠席'], weights=[80, 8, 4, 8])[0]
+        key = (student['学籍番号'], day, schedule['科目ID'],
+               f"2025-{schedule['学科ID']}-{schedule['期']}-{schedule['曜日']}-{schedule['時限']}")
+        if status == '欠席' and key in keys:
+            continue
+        keys.add(key)
+        entered = datetime.combine(day, time(8 + (schedule['時限'] - 1) * 2, 45))
+        records.append({'学生番号': student['学籍番号'], '記録日': day, 'ステータス': status, '授業科目ID': key[2],
+                        '週時間割ID': key[3], '記録種別': '欠席' if status == '欠席' else None,
+                        '入室日時': None if status == '欠席' else entered,
+                        '退室日時': None if status == '欠席' else entered + timedelta(minutes=95)})
+    for start in range(0, len(records), 10000):
+        db.session.execute(db.insert(入退室_出席記録), records[start:start + 10000])
+    db.session.commit()
+    rebuild_attendance_bitmaps()
+    rebuild_risk_states()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def _make_app(url):
+    # 時間割マトリクスのプリウォームのスレッドは起動させない
+    # (バックグラウンドで名簿などを先に読み込むと、発行される問い合わせがタイミングで変わるため)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': url, 'REPORT_DATABASE_URL': None, 'TESTING': True,
+                      'LESSON_MATRIX_PREWARM': False})
+    app.logger.setLevel('ERROR')   # 合成データの警告ログなどは表示しない
+    return app
+
+
+@pytest.fixture(scope='session')
+def synthetic_database(tmp_path_factory):
+    """合成データを入れたDBのURL (SQLite はテンプレートのファイル)"""
+    url = os.environ.get('QUERY_PLAN_DATABASE_URL')
+    if not url:
+        url = f"sqlite:///{tmp_path_factory.mktemp('synthetic') / 'template.db'}"
+    app = _make_app(url.replace("postgres://", "postgresql://"))
+    with app.app_context():
+        db.create_all()
+        if db.session.query(学生マスタ).first() is not None:
+            pytest.exit("QUERY_PLAN_DATABASE_URL には空のDBを指定してください。", returncode=1)
+        seed_synthetic_data(SYNTHETIC_RECORDS)
+        db.session.remove()
+        db.engine.dispose()
+    return app.config['SQLALCHEMY_DATABASE_URI']
+
+
+@pytest.fixture
+def app(synthetic_database, tmp_path):
+    """合成データ入りのアプリ (アプリケーションコンテキスト内で実行する)"""
+    url = synthetic_database
+    if url.startswith('sqlite:///'):
+        path = tmp_path / 'synthetic.db'
+        shutil.copyfile(url[len('sqlite:///'):], path)
+        url = f"sqlite:///{path}"
+    app = _make_app(url)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,91 @@
+# test_analytics.py (出席集計スナップショット: 出席率・連続欠席と、キャッシュの作り直し)
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+import analytics
+from main import db, bump_data_version, get_attendance_snapshot, 期マスタ
+
+A, B, C = 1001, 1002, 1003
+
+
+def row(student_no, day, period, status, subject_id=10):
+    return student_no, date(2025, 6, 2) + timedelta(days=day), f"2025-1-3-{day % 5 + 1}-{period}", subject_id, status
+
+
+def test_rates_and_counts():
+    snapshot = analytics.build_snapshot([A, B], [
+        row(A, 0, 1, '出席'), row(A, 0, 2, '遅刻'), row(A, 1, 1, '出席'), row(A, 1, 2, '欠席'),
+        row(A, 2, 1, '途中退室'),
+    ])
+    assert snapshot.student_row(A) == {
+        '総実施回数': 5, '出席回数': 2, '遅刻回数': 1, '欠席回数': 1, '途中入退室回数': 1,
+        '出席率': 40.0, '欠席率': 20.0, '最大連続欠席': 1, '現在連続欠席': 0, 'is_warning': False}
+    assert snapshot.student_row(B)['総実施回数'] == 0
+    assert snapshot.student_row(C)['出席率'] == 0.0
+    assert snapshot.subject_row(10) == {'総実施回数': 5, '出席回数': 2, '出席率': 40.0}
+    assert snapshot.student_subject_row(A, 10) == (2, 1, 5)
+
+
+def test_streaks_skip_sessions_without_records():
+    records = [row(A, 0, 1, '欠席'), row(A, 1, 1, '欠席'), row(A, 3, 1, '欠席'),   # 2日目は記録なし
+               row(A, 4, 1, '出席'), row(A, 7, 1, '欠席'), row(A, 7, 2, '欠席')]
+    student = analytics.build_snapshot([A], records).student_row(A)
+    assert (student['最大連続欠席'], student['現在連続欠席']) == (3, 2)
+    assert student['is_warning']
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_streaks_do_not_depend_on_record_order(seed):
+    # 同じ日の後の時限の記録が先に届く場合を含めて、並べ方によらず同じ結果になる
+    records = [row(A, 0, 2, '出席'), row(A, 0, 3, '欠席'), row(A, 1, 1, '欠席'), row(A, 1, 4, '出席'),
+               row(A, 1, 10, '欠席'), row(B, 0, 1, '欠席'), row(B, 0, 2, '欠席')]
+    expected = analytics.build_snapshot([A, B], records)
+    random.Random(seed).shuffle(records)
+    snapshot = analytics.build_snapshot([A, B], records)
+    assert snapshot.student_row(A) == expected.student_row(A)
+    assert (snapshot.student_row(A)['最大連続欠席'], snapshot.student_row(A)['現在連続欠席']) == (2, 1)
+    assert [key[1] for key in snapshot.session_keys[:3]] == ['2025-1-3-1-1', '2025-1-3-1-2', '2025-1-3-1-3']
+
+
+def test_highest_status_wins_within_a_session():
+    snapshot = analytics.build_snapshot([A], [row(A, 0, 1, '出席'), row(A, 0, 1, '欠席'), row(A, 0, 1, '遅刻')])
+    assert snapshot.student_row(A)['欠席回数'] == 1
+    assert snapshot.student_row(A)['総実施回数'] == 1
+
+
+def test_unknown_students_and_incomplete_rows_are_ignored():
+    snapshot = analytics.build_snapshot([A], [row(A, 0, 1, '出席'), row(C, 0, 1, '欠席'),
+                                              (A, None, '2025-1-3-1-2', 10, '欠席'), (A, date(2025, 6, 2), None, 10, '欠席')])
+    assert snapshot.student_row(A)['総実施回数'] == 1
+    assert C not in snapshot.student_index
+
+
+def test_snapshot_rebuild_is_rate_limited(app):
+    app.config['ANALYTICS_SNAPSHOT_MIN_SECONDS'] = 3600
+    first = get_attendance_snapshot()
+    assert first.total.sum() > 0
+    bump_data_version('attendance')
+    db.session.commit()
+    assert get_attendance_snapshot() is first
+
+    app.config['ANALYTICS_SNAPSHOT_MIN_SECONDS'] = 0
+    assert get_attendance_snapshot() is not first
+
+
+def test_snapshot_counts_only_the_current_term_period(app):
+    app.config['ANALYTICS_SNAPSHOT_MIN_SECONDS'] = 0
+    before = get_attendance_snapshot()
+    # 3期の期間を2025年10月からにすると、3期の学生のそれより前の記録は数えない
+    db.session.get(期マスタ, 3).開始日 = date(2025, 10, 1)
+    bump_data_version('attendance')
+    db.session.commit()
+    after = get_attendance_snapshot()
+    student = 250000007   # 3期
+    assert after.student_row(student)['総実施回数'] < before.student_row(student)['総実施回数']
+    recorded = after.codes[after.student_index[student]].nonzero()[0]
+    assert min(after.session_keys[j][0] for j in recorded) >= date(2025, 10, 1)
+    other = 250000000    # 1期
+    assert after.student_row(other) == before.student_row(other)
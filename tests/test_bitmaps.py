@@ -0,0 +1,106 @@
+# test_bitmaps.py (出席ビットマップ: 記録ごとの反映と、記録からの作り直しが一致すること)
+
+import random
+from datetime import date, datetime
+
+import pytest
+
+from bitmaps import AttendanceBitmap, SessionCalendar
+from main import (db, _absent_rows, _write_judgment, rebuild_attendance_bitmaps, record_scans, update_attendance_bitmaps,
+                  TimeTable, 入退室_出席記録, 出席ビットマップ, 週時間割)
+from conftest import SYNTHETIC_DAY
+
+STATUSES = ['出席', '遅刻', '途中退室', '欠席']
+
+
+def rebuilt(records):
+    """(通し番号, ステータス) の記録から作り直したビットマップ"""
+    bitmap = AttendanceBitmap()
+    for ordinal, status in records:
+        bitmap.set(ordinal, status)
+    return bitmap
+
+
+def state(bitmap):
+    return bitmap.present, bitmap.late, bitmap.partial, bitmap.absent
+
+
+def test_calendar_counts_from_term_start():
+    calendar = SessionCalendar(date(2026, 10, 1), 10)
+    assert calendar.ordinal(date(2026, 10, 1), 1) == 0
+    assert calendar.ordinal(date(2026, 10, 2), 9) == 18
+    assert calendar.session(18) == (date(2026, 10, 2), 9)
+    with pytest.raises(ValueError):
+        calendar.ordinal(date(2026, 9, 30), 1)
+    with pytest.raises(ValueError):
+        calendar.ordinal(date(2026, 10, 1), 11)
+    # 期の開始日より前の日はマスクに含めない
+    assert calendar.period_mask(date(2026, 9, 29), date(2026, 10, 2), 3) == (1 << 2) | (1 << 12)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_assign_matches_rebuild_in_any_order(seed):
+    rng = random.Random(seed)
+    # 同じ授業回に複数の記録がある状態で、追加・変更・削除を順不同で反映する
+    records = {i: (rng.randrange(6), rng.choice(STATUSES)) for i in range(30)}
+    bitmap = AttendanceBitmap()
+    current = {}
+    operations = list(records.items())
+    operations += [(i, (records[i][0], rng.choice(STATUSES))) for i in rng.sample(list(records), 10)]
+    operations += [(i, (records[i][0], None)) for i in rng.sample(list(records), 10)]
+    rng.shuffle(operations)
+    for record_id, (ordinal, status) in operations:
+        if status is None:
+            current.pop(record_id, None)
+        else:
+            current[record_id] = (ordinal, status)
+        bitmap.assign(ordinal, [s for o, s in current.values() if o == ordinal])
+    assert state(bitmap) == state(rebuilt(current.values()))
+
+
+def test_clearing_one_record_keeps_the_other_record_of_the_session():
+    bitmap = AttendanceBitmap()
+    bitmap.assign(3, ['欠席'])
+    bitmap.assign(3, ['欠席', '出席'])
+    assert bitmap.kind_at(3) == 'absent'
+    bitmap.assign(3, ['出席'])   # 欠席の記録だけを消す
+    assert bitmap.kind_at(3) == 'present'
+    bitmap.assign(3, [])
+    assert bitmap.kind_at(3) is None
+
+
+def stored_bitmaps():
+    return {(r.学籍番号, r.期): state(r.bitmap()) for r in db.session.query(出席ビットマップ)
+            if r.bitmap().recorded}
+
+
+def test_incremental_updates_match_rebuild(app):
+    rebuild_attendance_bitmaps()
+    today = SYNTHETIC_DAY.date()
+    schedule = db.session.query(週時間割).filter_by(年度=2025, 学科ID=2, 期=3, 曜日=1, 時限=1).one()
+    start = datetime.combine(today, db.session.get(TimeTable, schedule.時限).開始時刻)
+
+    # 欠席判定の後にスキャンが届き、自動欠席を置き換える / 退室でステータスが変わる
+    rows = _absent_rows(schedule, today)
+    _write_judgment([schedule], rows, today, SYNTHETIC_DAY)
+    db.session.commit()
+    students = [row['学生番号'] for row in rows[:3]]
+    record_scans([{'student_no': no, 'kind': 'in', 'timestamp': start.isoformat()} for no in students])
+    record_scans([{'student_no': students[0], 'kind': 'out', 'timestamp': start.replace(minute=start.minute + 5).isoformat()}])
+
+    # 同じ授業回・同じステータスの記録が2件ある状態で、1件だけ削除する
+    record = db.session.query(入退室_出席記録).filter(入退室_出席記録.記録種別.is_(None)).first()
+    copy = {'学生番号': record.学生番号, '記録日': record.記録日, 'ステータス': record.ステータス,
+            '授業科目ID': record.授業科目ID, '週時間割ID': record.週時間割ID, '入室日時': record.入室日時}
+    db.session.execute(db.insert(入退室_出席記録), [copy])
+    lesson = (record.学生番号, record.記録日, record.週時間割ID, record.授業科目ID)
+    update_attendance_bitmaps([(*lesson, None, record.ステータス)])
+    status = record.ステータス
+    db.session.delete(record)
+    db.session.flush()
+    update_attendance_bitmaps([(*lesson, status, None)])
+    db.session.commit()
+
+    incremental = stored_bitmaps()
+    rebuild_attendance_bitmaps()
+    assert incremental == stored_bitmaps()
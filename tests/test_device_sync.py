@@ -0,0 +1,61 @@
+# test_device_sync.py (機器のシーケンス番号付き同期: カーソル・重複・欠番)
+
+import threading
+
+from main import db, get_device_cursor, record_device_events, 機器同期状態
+
+# 合成データに記録のない日曜日 (授業に該当しないので '未定' として書き込まれる)
+SCAN_DAY = '2025-06-08'
+
+
+def event(seq, student_no=250000007, minute=0):
+    return {'seq': seq, 'student_no': student_no, 'timestamp': f"{SCAN_DAY}T09:{minute:02d}:00", 'kind': 'in'}
+
+
+def test_cursor_advances_and_duplicates_are_dropped(app):
+    result = record_device_events('R-1', [event(1), event(2, minute=1), event(2, minute=1)])
+    db.session.commit()
+    assert result == {'cursor': 2, 'accepted': 2, 'duplicates': 1, 'rejected': 0, 'pending': 0}
+
+    result = record_device_events('R-1', [event(2, minute=1), event(3, minute=2), {'student_no': 250000007}])
+    db.session.commit()
+    assert result == {'cursor': 3, 'accepted': 1, 'duplicates': 1, 'rejected': 1, 'pending': 0}
+    assert get_device_cursor('R-1') == 3
+
+
+def test_events_after_a_gap_are_pending_until_resent(app):
+    result = record_device_events('R-1', [event(1), event(3, minute=2), event(4, minute=3)])
+    db.session.commit()
+    assert result == {'cursor': 1, 'accepted': 1, 'duplicates': 0, 'rejected': 0, 'pending': 2}
+
+    # 保留分は保存されないので、機器はカーソルの続きから再送する
+    result = record_device_events('R-1', [event(2, minute=1), event(3, minute=2), event(4, minute=3)])
+    db.session.commit()
+    assert result == {'cursor': 4, 'accepted': 3, 'duplicates': 0, 'rejected': 0, 'pending': 0}
+
+
+def test_concurrent_first_syncs_share_one_cursor_row(app):
+    barrier = threading.Barrier(8)
+    results, errors = [], []
+
+    def sync(seq):
+        with app.app_context():
+            try:
+                barrier.wait()
+                results.append(record_device_events('R-new', [event(seq, minute=seq)]))
+                db.session.commit()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=sync, args=(seq,)) for seq in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert db.session.query(機器同期状態).filter(機器同期状態.機器ID == 'R-new').count() == 1
+    # どの順で直列化されても、カーソルは欠番なく受け付けた件数と一致する
+    assert get_device_cursor('R-new') == sum(r['accepted'] for r in results) >= 1
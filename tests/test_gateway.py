@@ -0,0 +1,48 @@
+# test_gateway.py (ゲートウェイの一括書き込み: 接続ごとの結果と失敗の切り分け)
+
+import gateway
+from gateway import ScanGateway
+from main import db, 入退室_出席記録
+
+
+class FakeConnection:
+    def __init__(self, peer, device_id=None):
+        self.peer = peer
+        self.device_id = device_id
+
+
+def scan(student_no, minute=0, **extra):
+    return {'student_no': student_no, 'timestamp': f"2025-06-08T09:{minute:02d}:00", 'kind': 'in', **extra}
+
+
+def scanned(student_no):
+    return db.session.query(入退室_出席記録).filter(
+        入退室_出席記録.学生番号 == student_no, 入退室_出席記録.記録日 == '2025-06-08').count()
+
+
+def test_failing_event_only_fails_its_connection(app, monkeypatch):
+    record_scans = gateway.record_scans
+
+    def failing(events, commit=True):
+        if any(e['student_no'] == 250000001 for e in events):
+            raise RuntimeError('poison')
+        return record_scans(events, commit=commit)
+
+    monkeypatch.setattr(gateway, 'record_scans', failing)
+    good, bad = FakeConnection('good'), FakeConnection('bad')
+    results = ScanGateway(app)._write([(good, scan(250000000)), (bad, scan(250000001)),
+                                       (good, scan(999999999)), (good, scan(250000002, minute=1))])
+
+    assert results[good] == {'ack': 2, 'rejected': 1}
+    assert results[bad] == {'error': '書き込みに失敗しました。', 'count': 1}
+    assert (scanned(250000000), scanned(250000001), scanned(250000002)) == (1, 0, 1)
+
+
+def test_connections_sharing_a_device_each_get_the_device_result(app):
+    first, second = FakeConnection('a', 'R-1'), FakeConnection('b', 'R-1')
+    results = ScanGateway(app)._write([(first, scan(250000000, seq=1)), (second, scan(250000000, seq=1)),
+                                       (second, scan(250000003, minute=1, seq=2))])
+
+    assert results[first] == {'ack': 1, 'rejected': 0, 'cursor': 1, 'duplicates': 0, 'pending': 0}
+    assert results[second] == {'ack': 1, 'rejected': 0, 'cursor': 2, 'duplicates': 1, 'pending': 0}
+    assert (scanned(250000000), scanned(250000003)) == (1, 1)
@@ -0,0 +1,40 @@
+# test_jobs.py (バックグラウンドジョブ: 中断されたジョブの整理とエクスポート)
+
+import csv
+import io
+from datetime import date, datetime
+
+import main
+from main import db, execute_job, fail_interrupted_jobs, バックグラウンドジョブ, 入退室_出席記録
+
+
+def add_job(kind, state, params='{}'):
+    job = バックグラウンドジョブ(種別=kind, 引数=params, 状態=state, 進捗=0, 作成日時=datetime.now())
+    db.session.add(job)
+    db.session.commit()
+    return job.ジョブID
+
+
+def test_interrupted_jobs_are_marked_failed(app):
+    waiting, running, done = add_job('judge', '待機'), add_job('judge', '実行中'), add_job('judge', '完了')
+    assert fail_interrupted_jobs() == 2
+    db.session.expire_all()
+    states = {job.ジョブID: job.状態 for job in db.session.query(バックグラウンドジョブ)}
+    assert (states[waiting], states[running], states[done]) == ('失敗', '失敗', '完了')
+    assert db.session.get(バックグラウンドジョブ, running).終了日時 is not None
+
+
+def test_export_streams_records_in_chunks(app, monkeypatch):
+    monkeypatch.setattr(main, 'EXPORT_YIELD_PER', 7)
+    job_id = add_job('export_records', '待機', '{"date_from": "2025-06-02", "date_to": "2025-06-06"}')
+    execute_job(job_id)
+    job = db.session.get(バックグラウンドジョブ, job_id)
+    assert job.状態 == '完了'
+    assert job.結果.startswith('﻿'.encode('utf-8'))
+
+    rows = list(csv.reader(io.StringIO(job.結果.decode('utf-8-sig'))))
+    expected = db.session.query(入退室_出席記録.記録ID).filter(
+        入退室_出席記録.記録日.between(date(2025, 6, 2), date(2025, 6, 6))).order_by(入退室_出席記録.記録ID).all()
+    assert rows[0][:3] == ['記録ID', '学生番号', '記録日']
+    assert [int(r[0]) for r in rows[1:]] == [r.記録ID for r in expected]
+    assert job.メッセージ == f'{len(expected)}件'
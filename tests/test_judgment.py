@@ -0,0 +1,68 @@
+# test_judgment.py (自動欠席判定と、同じ授業回に届くスキャン・手動入力との競合)
+
+from datetime import datetime
+
+from main import db, _absent_rows, _write_judgment, record_scans, TimeTable, 入退室_出席記録, 週時間割
+from conftest import SYNTHETIC_DAY
+
+TODAY = SYNTHETIC_DAY.date()
+
+
+def lesson_records(student_no, schedule):
+    return db.session.query(入退室_出席記録.記録種別, 入退室_出席記録.ステータス).filter(
+        入退室_出席記録.学生番号 == student_no,
+        入退室_出席記録.記録日 == TODAY,
+        入退室_出席記録.授業科目ID == schedule.科目ID).all()
+
+
+def monday_schedule():
+    return db.session.query(週時間割).filter_by(年度=2025, 学科ID=2, 期=3, 曜日=1, 時限=1).one()
+
+
+def test_scan_between_read_and_write_is_not_marked_absent(app):
+    schedule = monday_schedule()
+    rows = _absent_rows(schedule, TODAY)
+    student_no = rows[0]['学生番号']
+
+    # 欠席行を作った後、書き込む前にスキャンがコミットされる
+    start = db.session.get(TimeTable, schedule.時限).開始時刻
+    result = record_scans([{'student_no': student_no, 'kind': 'in',
+                            'timestamp': datetime.combine(TODAY, start).isoformat()}])
+    assert result == {'accepted': 1, 'rejected': 0}
+
+    inserted = _write_judgment([schedule], rows, TODAY, SYNTHETIC_DAY)
+    db.session.commit()
+
+    assert inserted == len(rows) - 1
+    assert lesson_records(student_no, schedule) == [(None, '出席')]
+    assert all(r.記録種別 == '欠席' for r in lesson_records(rows[1]['学生番号'], schedule))
+
+
+def test_judgment_is_idempotent(app):
+    schedule = monday_schedule()
+    rows = _absent_rows(schedule, TODAY)
+    assert _write_judgment([schedule], rows, TODAY, SYNTHETIC_DAY) == len(rows)
+    assert _write_judgment([schedule], rows, TODAY, SYNTHETIC_DAY) == 0
+
+
+def test_manual_entry_skips_lesson_with_absent_record(app, client):
+    schedule = monday_schedule()
+    rows = _absent_rows(schedule, TODAY)
+    _write_judgment([schedule], rows, TODAY, SYNTHETIC_DAY)
+    db.session.commit()
+    student_no = rows[0]['学生番号']
+
+    response = client.post('/manual_entry', data={
+        'student_no': student_no, 'status': '出席', 'subject_id': schedule.科目ID,
+        'entry_datetime': datetime.combine(TODAY, datetime.min.time()).isoformat()})
+    assert 'この学生・日・科目の記録は既に存在します。' in response.get_data(as_text=True)
+    assert lesson_records(student_no, schedule) == [('欠席', '欠席')]
+
+    # 別の日なら同じ科目でも追加できる
+    other_day = datetime(2025, 6, 9, 9, 0)
+    response = client.post('/manual_entry', data={
+        'student_no': student_no, 'status': '出席', 'subject_id': schedule.科目ID,
+        'entry_datetime': other_day.isoformat()})
+    assert '記録を追加しました。' in response.get_data(as_text=True)
+    assert db.session.query(入退室_出席記録).filter_by(学生番号=student_no, 記録日=other_day.date(),
+                                                      記録種別='手動').count() == 1
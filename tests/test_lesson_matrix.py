@@ -0,0 +1,20 @@
+# test_lesson_matrix.py (学生別時間割マトリクスのキャッシュ)
+
+import threading
+
+from main import db, get_lesson_matrix, get_lesson_matrix_cache, 学生マスタ
+
+
+def test_prewarm_thread_follows_config(app):
+    assert app.config['LESSON_MATRIX_PREWARM'] is False
+    cache = get_lesson_matrix_cache()
+    assert get_lesson_matrix_cache() is cache
+    assert not [t for t in threading.enumerate() if t.name == 'lesson-matrix-prewarm']
+
+
+def test_matrix_is_reused_from_cache(app):
+    student = db.session.get(学生マスタ, 250000007)
+    cache = get_lesson_matrix_cache()
+    first = get_lesson_matrix(student, 3)
+    assert get_lesson_matrix(student, 3) is first
+    assert (cache.hits, cache.misses) == (1, 1)
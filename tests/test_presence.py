@@ -0,0 +1,38 @@
+# test_presence.py (在室時間: 区間の併合とステータス)
+
+from datetime import datetime
+
+from presence import derive_status, merge_intervals, session_presence, total_minutes
+
+START, END = datetime(2025, 6, 2, 8, 50), datetime(2025, 6, 2, 10, 20)
+
+
+def at(hour, minute):
+    return datetime(2025, 6, 2, hour, minute)
+
+
+def test_overlapping_and_touching_intervals_are_merged():
+    merged = merge_intervals([(at(9, 30), at(9, 50)), (at(8, 50), at(9, 10)), (at(9, 0), at(9, 20)),
+                              (at(9, 20), at(9, 25)), (at(9, 40), at(9, 45))], START, END)
+    assert merged == [(at(8, 50), at(9, 25)), (at(9, 30), at(9, 50))]
+    assert total_minutes(merged) == 55
+
+
+def test_intervals_are_clipped_to_the_class_and_open_ends_filled():
+    merged = merge_intervals([(at(8, 30), at(9, 0)), (None, None), (at(7, 0), at(8, 0)), (at(10, 0), None)],
+                             START, END)
+    assert merged == [(START, at(9, 0)), (at(10, 0), END)]
+    assert merge_intervals([(None, at(9, 10))], START, END) == [(START, at(9, 10))]
+
+
+def test_status_from_ratio_and_missing_part():
+    assert derive_status([(at(8, 55), END)], START, END) == '出席'
+    assert derive_status([(at(9, 10), END)], START, END) == '遅刻'
+    assert derive_status([(START, at(9, 50))], START, END) == '途中退室'
+    assert derive_status([(at(9, 30), END)], START, END) == '途中入室'
+    assert derive_status([(START, at(9, 20))], START, END) == '欠席'
+    assert derive_status([], START, END) == '欠席'
+
+
+def test_session_presence():
+    assert session_presence([(at(8, 45), at(9, 30)), (at(9, 35), None)], START, END) == (85, 90, '出席', 2)
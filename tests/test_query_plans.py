@@ -0,0 +1,170 @@
+# test_query_plans.py (実行計画の回帰テスト)
+#
+# 合成データのDBで、よく使うページ・API・判定処理を実際に実行し、発行された SELECT の実行計画
+# (SQLite は EXPLAIN QUERY PLAN、PostgreSQL は EXPLAIN (COSTS OFF)) を
+# query_plans/<方言>/<ケース名>.txt のスナップショットと比べる。
+# インデックスで引いていたテーブルが全件走査になった場合と、一時的なソート (TEMP B-TREE / Sort) が
+# 増えた場合、スナップショットにない問い合わせがある場合は失敗。それ以外の計画の変化は警告だけ出す。
+# 問い合わせを追加・変更したら `pytest --update-query-plans` でスナップショットを書き直し、差分をレビューに含める。
+
+import os
+import re
+import threading
+import warnings
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from main import db, run_judgment
+from conftest import SYNTHETIC_DAY
+
+QUERY_PLAN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'query_plans')
+STUDENT_NO = 250000007   # 学科2・3期 の合成学生
+DAY = SYNTHETIC_DAY.date().isoformat()
+
+# (ケース名, 実行する処理)。ケースごとに合成データのDBを複製し、キャッシュが空のアプリで実行する
+CASES = [
+    ('index', lambda client: client.get('/')),
+    ('absent_check', lambda client: client.get('/absent-check')),
+    ('student_management', lambda client: client.get(f"/student_management?student_no={STUDENT_NO}&term_id=3")),
+    ('warning_students', lambda client: client.get('/warning_students')),
+    ('api_v1_attendance', lambda client: client.get(f"/api/v1/attendance?date={DAY}&limit=100&after=1000")),
+    ('api_v1_attendance_student', lambda client: client.get(
+        f"/api/v1/attendance?from=2025-04-01&to=2025-09-30&student_no={STUDENT_NO}")),
+    ('scans', lambda client: client.post('/api/scans', json={'events': [
+        {'student_no': 250000000 + i, 'timestamp': f"{DAY}T08:4{i % 10}:00", 'kind': 'in'} for i in range(20)]})),
+    ('judgment', lambda client: run_judgment(now=SYNTHETIC_DAY, workers=1)),
+]
+
+
+def plan_sql(statement):
+    """スナップショットのキーにする SQL (空白をまとめ、IN の展開数の違いを無視する)"""
+    statement = ' '.join(statement.split())
+    statement = re.sub(r'\((?:\?, )+\?\)', '(?...)', statement)
+    return re.sub(r'\((?:%\(\w+\)s, )+%\(\w+\)s\)', '(?...)', statement)
+
+
+def explain_plan(connection, statement, parameters):
+    """SELECT の実行計画を行のリストで返す (SQLite は木構造を字下げで表す)"""
+    if connection.dialect.name == 'sqlite':
+        depth = {0: -1}
+        lines = []
+        for id_, parent, _, detail in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+            depth[id_] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[id_] + detail)
+        return lines
+    return [line for (line,) in connection.exec_driver_sql(f"EXPLAIN (COSTS OFF) {statement}", parameters)]
+
+
+def plan_accesses(lines):
+    """計画の各行から ({テーブル名: 'index' / 'scan'}, 一時ソートの数) を求める"""
+    accesses = {}
+    sorts = 0
+    for line in lines:
+        line = line.strip().removeprefix('->').strip()
+        # SQLite: SEARCH はインデックスで範囲を絞った読み取り。SCAN は (インデックス経由でも) 全件を読む
+        match = re.match(r'(SEARCH|SCAN) (\S+)', line)
+        if match:
+            kind = 'index' if match.group(1) == 'SEARCH' else 'scan'
+        else:
+            match = re.match(r'(Seq Scan|Index Scan|Index Only Scan|Bitmap Heap Scan)(?: using \S+)? on (\S+)', line)
+            kind = ('scan' if match.group(1) == 'Seq Scan' else 'index') if match else None
+        if kind:
+            table = match.group(2).strip('"')
+            if accesses.get(table) != 'scan':
+                accesses[table] = kind
+        if 'USE TEMP B-TREE' in line or re.match(r'(Incremental )?Sort\b', line):
+            sorts += 1
+    return accesses, sorts
+
+
+def capture_query_plans(case, client):
+    """処理を実行し、発行された SELECT ごとの [(SQL, 計画の行)] を返す (同じ SQL は最初の1回だけ)"""
+    captured = {}
+    lock = threading.Lock()
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        # 判定のワーカースレッドの問い合わせも含める (プリウォームのスレッドは conftest で起動しない)
+        if executemany:
+            return
+        if statement.lstrip().upper().startswith('SELECT'):
+            with lock:
+                captured.setdefault(plan_sql(statement), (statement, parameters))
+
+    event.listen(Engine, 'before_cursor_execute', listener)
+    try:
+        case(client)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', listener)
+    db.session.rollback()
+    with db.engine.connect() as connection:
+        return [(sql, explain_plan(connection, statement, parameters))
+                for sql, (statement, parameters) in captured.items()]
+
+
+def format_query_plans(plans):
+    return ''.join(f"SQL: {sql}\n" + ''.join(f"{line}\n" for line in lines) + '\n' for sql, lines in plans)
+
+
+def parse_query_plans(text):
+    """スナップショットのテキストを {SQL: 計画の行} に戻す"""
+    plans = {}
+    for block in text.split('\n\n'):
+        lines = block.strip('\n').split('\n')
+        if lines and lines[0].startswith('SQL: '):
+            plans[lines[0][len('SQL: '):]] = lines[1:]
+    return plans
+
+
+def compare_query_plans(expected, actual):
+    """
+    (回帰のリスト, 変化のリスト) を返す。回帰は全件走査・一時ソートの増加と、スナップショットにない問い合わせ。
+    SQL が同じものどうしを比べ、SQL が変わったものは残りを順番に組み合わせて比べる (条件を書き換えた場合など)。
+    """
+    regressions = []
+    changes = []
+    unmatched = [sql for sql in expected if sql not in {a for a, _ in actual}]
+    for sql, lines in actual:
+        if sql in expected:
+            before_sql = sql
+        elif unmatched:
+            before_sql = unmatched.pop(0)
+            changes.append(f"SQL が変わりました: {sql[:120]}")
+        else:
+            regressions.append(f"スナップショットにない問い合わせ: {sql[:120]}")
+            continue
+        if lines == expected[before_sql]:
+            continue
+        before, before_sorts = plan_accesses(expected[before_sql])
+        after, after_sorts = plan_accesses(lines)
+        scans = [t for t, kind in after.items() if kind == 'scan' and before.get(t) == 'index']
+        for table in scans:
+            regressions.append(f"{table} がインデックスを使わない全件走査になりました: {sql[:120]}\n  " +
+                               '\n  '.join(lines))
+        if after_sorts > before_sorts:
+            regressions.append(f"一時ソートが {before_sorts} → {after_sorts} に増えました: {sql[:120]}\n  " +
+                               '\n  '.join(lines))
+        if not scans and after_sorts <= before_sorts:
+            changes.append(f"計画が変わりました: {sql[:120]}")
+    changes += [f"実行されなくなった問い合わせ: {sql[:120]}" for sql in unmatched]
+    return regressions, changes
+
+
+@pytest.mark.parametrize('name,case', CASES, ids=[name for name, _ in CASES])
+def test_query_plan(name, case, client, request):
+    plans = capture_query_plans(case, client)
+    assert plans, f"{name}: SELECT が1件も実行されませんでした"
+    path = os.path.join(QUERY_PLAN_DIR, db.engine.dialect.name, f"{name}.txt")
+    if request.config.getoption('--update-query-plans'):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(format_query_plans(plans))
+        return
+    if not os.path.exists(path):
+        pytest.fail(f"スナップショットがありません: {path} (pytest --update-query-plans で作成)")
+    with open(path, encoding='utf-8') as f:
+        regressions, changes = compare_query_plans(parse_query_plans(f.read()), plans)
+    for message in changes:
+        warnings.warn(f"{name}: {message}")
+    assert not regressions, '\n'.join(regressions)
@@ -0,0 +1,74 @@
+# test_risk_states.py (学生リスク状態: 記録の順序や取り消しによらず、作り直した値と一致すること)
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from main import (db, make_week_schedule_id, rebuild_risk_states, update_attendance_bitmaps, update_risk_states,
+                  入退室_出席記録, 学生リスク状態, 週時間割)
+
+STUDENT_NO = 250000007   # 学科2・3期 の合成学生
+FIRST_DAY = date(2026, 2, 2)   # 合成データの記録より後の月曜日
+
+
+def risk_state(student_no):
+    st = db.session.get(学生リスク状態, student_no)
+    db.session.refresh(st)
+    return st.期, st.現在連続欠席, st.最大連続欠席, st.出席回数, st.欠席回数, st.総回数, st.警告
+
+
+def add_record(student_no, day, period, status):
+    """記録を1件書き込み、取り込み経路と同じ順でビットマップ・リスク状態に反映する"""
+    schedule = db.session.query(週時間割).filter_by(年度=2025, 学科ID=2, 期=3, 曜日=day.weekday() + 1,
+                                                     時限=period).one()
+    record = 入退室_出席記録(学生番号=student_no, 記録日=day, ステータス=status, 授業科目ID=schedule.科目ID,
+                         週時間割ID=make_week_schedule_id(schedule), 記録種別='欠席' if status == '欠席' else None)
+    db.session.add(record)
+    db.session.flush()
+    update_attendance_bitmaps([(student_no, day, record.週時間割ID, record.授業科目ID, None, status)])
+    update_risk_states([(student_no, None, status)])
+    return record
+
+
+def change_status(record, status):
+    old = record.ステータス
+    record.ステータス = status
+    db.session.flush()
+    update_attendance_bitmaps([(record.学生番号, record.記録日, record.週時間割ID, record.授業科目ID, old, status)])
+    update_risk_states([(record.学生番号, old, status)])
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_records_in_any_order_match_rebuild(app, seed):
+    rng = random.Random(seed)
+    lessons = [(FIRST_DAY + timedelta(days=d), period) for d in range(5) for period in (1, 2, 3)]
+    statuses = ['欠席'] * 7 + ['出席'] * 5 + ['遅刻', '途中退室', '欠席']
+    records = list(zip(lessons, statuses))
+    rng.shuffle(records)   # 前の時限の欠席が、後の時限のスキャンより後に届く場合を含む
+    added = [add_record(STUDENT_NO, day, period, status) for (day, period), status in records]
+    change_status(rng.choice(added), '出席')
+    db.session.commit()
+
+    incremental = risk_state(STUDENT_NO)
+    rebuild_risk_states([STUDENT_NO])
+    assert incremental == risk_state(STUDENT_NO)
+
+
+def test_warning_clears_when_absence_is_reversed(app):
+    # 警告になっていない 学科2・3期 の学生 (学籍番号 % 3 == 2)
+    student_no = db.session.query(学生リスク状態.学籍番号).filter(
+        学生リスク状態.警告.is_(False), 学生リスク状態.最大連続欠席 < 2, 学生リスク状態.現在連続欠席 == 0,
+        学生リスク状態.欠席回数 * 10 < 学生リスク状態.総回数,
+        学生リスク状態.学籍番号 % 3 == 2, 学生リスク状態.期 == 3).order_by(学生リスク状態.学籍番号).first()[0]
+    added = [add_record(student_no, FIRST_DAY, period, '欠席') for period in (1, 2, 3)]
+    db.session.commit()
+    assert risk_state(student_no)[1:3] == (3, 3)
+    assert risk_state(student_no)[-1] is True
+
+    change_status(added[1], '出席')   # 欠席の取り消し (遅れて届いたスキャンなど)
+    db.session.commit()
+    state = risk_state(student_no)
+    assert state[1] == 1 and state[2] < 3
+    assert state[-1] is False
+    assert db.session.get(学生リスク状態, student_no).警告開始日時 is None
@@ -0,0 +1,45 @@
+# test_roster.py (学生名簿インデックスと学生検索)
+
+from main import db, get_roster, invalidate_roster, 学生マスタ
+from roster import MISSING, RosterIndex, StudentSearchIndex, normalize_name
+
+ROWS = [(300, 2, 1, 3), (100, 1, 1, 1), (200, 1, 1, None), (400, None, 2, 2)]
+
+
+def test_lookup_and_groups():
+    roster = RosterIndex(ROWS)
+    assert len(roster) == 4
+    assert roster.lookup(100) == (1, 1, 1)
+    assert roster.lookup(200) == (1, 1, MISSING)
+    assert roster.lookup(400) == (MISSING, 2, 2)
+    assert roster.lookup(150) is None and 150 not in roster and 300 in roster
+    assert list(roster.group(1, 1)) == [100, 200]
+    assert list(roster.group(3, 1)) == []
+    assert {key: list(numbers) for key, numbers in roster.groups(term=1).items()} == {(1, 1): [100, 200], (2, 1): [300]}
+
+
+def test_normalize_name_folds_kana_width_and_spaces():
+    assert normalize_name('タナカ 太郎') == normalize_name('ﾀﾅｶ　太郎') == normalize_name('たなか太郎') == 'たなか太郎'
+    assert normalize_name('ＡＢＣ') == 'abc'
+    assert normalize_name(None) == ''
+
+
+def test_search_by_number_prefix_then_name():
+    index = StudentSearchIndex([(250001, 'スズキ 一郎'), (250002, '田中 花子'), (251000, '鈴木 次郎'),
+                                (260000, 'すずき 三郎')])
+    assert index.search('2500') == [(250001, 'スズキ 一郎'), (250002, '田中 花子')]
+    assert index.search('２５１') == [(251000, '鈴木 次郎')]
+    assert index.search('ｽｽﾞｷ') == [(250001, 'スズキ 一郎'), (260000, 'すずき 三郎')]
+    assert index.search('', limit=2) == [(250001, 'スズキ 一郎'), (250002, '田中 花子')]
+    assert index.search('山田') == []
+
+
+def test_roster_is_rebuilt_after_invalidate(app):
+    roster = get_roster()
+    assert roster.lookup(250000007) == (2, 3, 3)
+    assert get_roster() is roster
+
+    db.session.add(学生マスタ(学籍番号=259999999, 氏名='追加', 学年=1, 学科ID=1, 期=1))
+    db.session.commit()
+    invalidate_roster()
+    assert get_roster().lookup(259999999) == (1, 1, 1)
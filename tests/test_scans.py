@@ -0,0 +1,58 @@
+# test_scans.py (スキャンの取り込み: 取り込み時のステータス判定と自動欠席行の置き換え)
+
+from datetime import date, datetime, time
+
+from main import db, _absent_rows, _write_judgment, get_roster, record_scans, 入退室_出席記録, 週時間割
+
+# 合成データの記録がない期間内の月曜日。学科2・3期の1限は 8:50〜10:20
+DAY = date(2026, 3, 2)
+
+
+def at(hour, minute):
+    return datetime.combine(DAY, time(hour, minute)).isoformat()
+
+
+def scan(student_no, timestamp, kind='in'):
+    return {'student_no': student_no, 'timestamp': timestamp, 'kind': kind}
+
+
+def statuses(student_no):
+    return db.session.query(入退室_出席記録.記録種別, 入退室_出席記録.ステータス).filter(
+        入退室_出席記録.学生番号 == student_no, 入退室_出席記録.記録日 == DAY).order_by(入退室_出席記録.記録ID).all()
+
+
+def test_entry_and_exit_are_classified_on_write(app):
+    a, b, c, d, e = get_roster().group(2, 3)[:5]
+    result = record_scans([
+        scan(a, at(8, 45)),
+        scan(b, at(9, 1)),                  # 開始 + 10分を過ぎて 20分まで
+        scan(c, at(9, 11)),                 # 開始 + 20分を過ぎた
+        scan(d, at(8, 40)), scan(d, at(9, 30), 'out'),
+        scan(e, at(20, 0)),                 # 授業に該当しない
+        scan(999999999, at(8, 45)),         # 名簿にない
+        {'student_no': a, 'timestamp': 'yesterday'},
+    ])
+    assert result == {'accepted': 6, 'rejected': 2}
+    assert [statuses(no) for no in (a, b, c, d, e)] == [
+        [(None, '出席')], [(None, '遅刻')], [(None, '欠席')], [(None, '途中退室')], [(None, '未定')]]
+
+
+def test_exit_closes_a_record_from_an_earlier_batch(app):
+    student_no = get_roster().group(2, 3)[0]
+    record_scans([scan(student_no, at(8, 45))])
+    record_scans([scan(student_no, at(9, 30), 'out'), scan(student_no, at(9, 40)), scan(student_no, at(10, 30), 'out')])
+    assert statuses(student_no) == [(None, '途中退室'), (None, '途中入室')]
+
+
+def test_late_scan_replaces_the_absent_record(app):
+    schedule = db.session.query(週時間割).filter_by(年度=2025, 学科ID=2, 期=3, 曜日=1, 時限=1).one()
+    rows = _absent_rows(schedule, DAY)
+    _write_judgment([schedule], rows, DAY, datetime.combine(DAY, time(17, 0)))
+    db.session.commit()
+    student_no = rows[0]['学生番号']
+    assert statuses(student_no) == [('欠席', '欠席')]
+
+    # オフラインだった機器から授業中の入室が後で届く
+    assert record_scans([scan(student_no, at(9, 5))]) == {'accepted': 1, 'rejected': 0}
+    assert statuses(student_no) == [(None, '遅刻')]
+    assert statuses(rows[1]['学生番号']) == [('欠席', '欠席')]
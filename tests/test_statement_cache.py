@@ -0,0 +1,46 @@
+# test_statement_cache.py (組み立て済みの文が SQL のコンパイルキャッシュを再利用すること)
+
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+
+from main import (db, ABSENT_COUNTS_STATEMENT, ABSENT_STUDENTS_STATEMENT, STUDENT_SCHEDULES_STATEMENT,
+                  STUDENT_RECORDS_STATEMENT, STUDENT_IDS_STATEMENT, SNAPSHOT_RECORDS_STATEMENT,
+                  WARNING_STATES_STATEMENT)
+
+# (文, 1回目の引数, 2回目の引数)。引数を変えても2回目はコンパイル済みの SQL を使うこと
+STATEMENTS = {
+    'absent_counts': (ABSENT_COUNTS_STATEMENT,
+                      {'dept_id': 1, 'day': date(2025, 6, 2)}, {'dept_id': 3, 'day': date(2025, 6, 3)}),
+    'absent_students': (ABSENT_STUDENTS_STATEMENT, {'day': date(2025, 6, 2)}, {'day': date(2025, 6, 3)}),
+    'student_schedules': (STUDENT_SCHEDULES_STATEMENT,
+                          {'dept_id': 1, 'term_id': 1}, {'dept_id': 2, 'term_id': 3}),
+    'student_records': (STUDENT_RECORDS_STATEMENT,
+                        {'student_no': 250000000, 'subject_ids': [3, 6, 9]},
+                        {'student_no': 250000001, 'subject_ids': [1]}),
+    'student_ids': (STUDENT_IDS_STATEMENT, {}, {}),
+    'snapshot_records': (SNAPSHOT_RECORDS_STATEMENT,
+                         {'year_start': date(2025, 4, 1), 'year_end': date(2026, 3, 31)},
+                         {'year_start': date(2026, 4, 1), 'year_end': date(2027, 3, 31)}),
+    'warning_states': (WARNING_STATES_STATEMENT, {}, {}),
+}
+
+
+@pytest.mark.parametrize('name', list(STATEMENTS))
+def test_statement_cache_hit(name, app):
+    statement, first, second = STATEMENTS[name]
+    cache_hits = []
+
+    def listener(conn, cursor, sql, parameters, context, executemany):
+        cache_hits.append(context.cache_hit)
+
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        db.session.execute(statement, first).all()
+        cache_hits.clear()
+        db.session.execute(statement, second).all()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    assert cache_hits == [CACHE_HIT]
@@ -0,0 +1,7 @@
+# wsgi.py (Gunicorn/Render 用エントリポイント)
+# 起動例: gunicorn -c gunicorn.conf.py wsgi:app
+# (以前の gunicorn main:app も互換のため動くが、main.py はアプリを作らないファクトリ方式になった)
+
+from main import create_app
+
+app = create_app()